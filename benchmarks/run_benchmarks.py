@@ -0,0 +1,245 @@
+"""
+Pipeline Benchmark Suite
+========================
+
+Times load_data, the grouped fraud queries (both as SQL and from the
+stored counters the pipeline answers them with), repeat_fraud_cards,
+high_risk_merchants, the per-card detectors, every chart and the CSV
+export on synthetic datasets of several sizes, and compares the results
+with a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 100000 500000] [--repeat 3]
+    python benchmarks/run_benchmarks.py --save-baseline          # record this host's numbers
+    python benchmarks/run_benchmarks.py --threshold 0.2          # fail on >20% slowdowns
+
+Each case reports its best-of-`repeat` wall time, throughput in dataset
+rows per second and peak memory: how far the process's resident set rose
+above its size when the case started. The exit status is 1 when any case
+is slower than the baseline by more than --threshold (or uses more memory
+than --memory-threshold allows), and also when there is no baseline to
+compare with, so CI can gate deployments on it.
+Baselines are host specific; record one on the machine that runs the
+comparison. Input CSVs come from synthetic_data.py and are kept in
+--data-dir between runs.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import fraud_analysis as fa  # noqa: E402
+import synthetic_data  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / "data"
+
+# ANALYSES benchmarked as "query:<name>" and "detect:<name>" cases
+QUERY_CASES = [
+    "fraud_by_category", "fraud_by_hour", "fraud_by_day_of_week", "fraud_by_amount",
+    "fraud_by_state", "fraud_by_gender", "fraud_by_age_group", "fraud_by_city_size",
+    "fraud_monthly_trend", "repeat_fraud_cards", "high_risk_merchants", "amount_histogram",
+]
+DETECT_CASES = ["rapid_successive_txns", "geo_velocity_anomalies"]
+
+# Cases faster than this are too noisy to call a regression on
+MIN_SECONDS = 0.005
+
+
+def _proc_status_mb(field: str) -> float:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise OSError(field)
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux); False where that is not possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(func) -> tuple:
+    """(seconds, peak MB above the starting RSS, result) of one call."""
+    if _reset_peak_rss():
+        before = _proc_status_mb("VmRSS")
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        peak = _proc_status_mb("VmHWM") - before
+    else:
+        # Without a resettable high-water mark only growth of the lifetime peak is visible
+        before = fa.peak_rss_mb()
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        peak = fa.peak_rss_mb() - before
+    return seconds, max(peak, 0.0), result
+
+
+def run_case(results: dict, size: int, name: str, func, repeat: int):
+    """Run func `repeat` times, record the best time and largest peak, and return its last result."""
+    runs = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            runs.append(measure(func))
+    seconds = min(run[0] for run in runs)
+    results[f"{size}/{name}"] = {
+        "rows": size,
+        "seconds": round(seconds, 5),
+        "rows_per_s": round(size / seconds) if seconds > 0 else None,
+        "peak_mb": round(max(run[1] for run in runs), 1),
+    }
+    print(f"  {name:<36} {seconds:>9.3f}s {size / max(seconds, 1e-9):>14,.0f} rows/s "
+          f"{results[f'{size}/{name}']['peak_mb']:>9.1f} MB")
+    return runs[-1][2]
+
+
+def dataset(size: int, seed: int, data_dir: Path) -> Path:
+    """Synthetic CSV of `size` rows, generated on first use."""
+    path = data_dir / f"synthetic_{size}_seed{seed}.csv"
+    if not path.exists():
+        data_dir.mkdir(parents=True, exist_ok=True)
+        print(f"[+] Generating {size:,} synthetic rows -> {path}")
+        synthetic_data.write_csv(str(path), size, seed)
+    return path
+
+
+def benchmark_size(size: int, seed: int, data_dir: Path, repeat: int, results: dict) -> None:
+    csv_path = dataset(size, seed, data_dir)
+    print(f"\n--- {size:,} rows ---")
+
+    conns = []
+
+    def load():
+        for conn in conns:
+            conn.close()
+        # One process, so the parent's peak RSS is the whole load's
+        conns[:] = [fa.load_data(str(csv_path), db_path=":memory:", workers=1)]
+        return conns[0]
+
+    conn = run_case(results, size, "load_data", load, repeat)
+    frames = {}
+    for name in QUERY_CASES:
+        frames[name] = run_case(results, size, f"query:{name}",
+                                lambda: fa.ANALYSES[name][1](conn), repeat)
+    # What main runs for the grouped queries: all of them from the stored counters
+    run_case(results, size, "query:fraud_aggregates", lambda: fa.fraud_aggregates(conn), repeat)
+    for name in DETECT_CASES:
+        frames[name] = run_case(results, size, f"detect:{name}",
+                                lambda: fa.ANALYSES[name][1](conn), repeat)
+
+    fa._init_render_worker()
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name, (func, inputs) in fa.CHARTS.items():
+            run_case(results, size, f"chart:{name}",
+                     lambda: func(*[frames[i] for i in inputs], out_dir), repeat)
+        run_case(results, size, "export:csv",
+                 lambda: fa.export_results(frames, out_dir, "csv"), repeat)
+    conn.close()
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sqlite": fa.sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, memory_threshold=None) -> list:
+    """Human-readable regressions of results against baseline["results"]."""
+    regressions = []
+    for key, current in results.items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        slower = current["seconds"] / old["seconds"] - 1 if old["seconds"] > 0 else 0.0
+        if slower > threshold and current["seconds"] - old["seconds"] > MIN_SECONDS:
+            regressions.append(f"{key}: {old['seconds']:.3f}s -> {current['seconds']:.3f}s "
+                               f"({slower:+.0%}, threshold {threshold:.0%})")
+        if memory_threshold is not None and old["peak_mb"] > 0:
+            grown = current["peak_mb"] / old["peak_mb"] - 1
+            if grown > memory_threshold:
+                regressions.append(f"{key}: peak {old['peak_mb']:.1f} MB -> {current['peak_mb']:.1f} MB "
+                                   f"({grown:+.0%}, threshold {memory_threshold:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 500_000], help="dataset rows")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest counts")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="where generated CSVs are kept")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write the results JSON here")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline time (default 0.25)")
+    parser.add_argument("--memory-threshold", type=float,
+                        help="allowed peak-memory growth as a fraction (default: memory is not gated)")
+    args = parser.parse_args(argv)
+
+    # Repeated runs must execute the queries, not read them from the result cache
+    fa.QUERY_CACHE.enabled = False
+    results = {}
+    for size in args.sizes:
+        benchmark_size(size, args.seed, args.data_dir, args.repeat, results)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\n[+] Saved baseline with {len(results)} cases to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\n[!] No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 1
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("environment") != report["environment"]:
+        print(f"\n[=] Baseline was recorded on a different environment: {baseline.get('environment')}")
+    compared = sum(key in baseline["results"] for key in results)
+    if not compared:
+        print(f"\n[!] {args.baseline} has none of these {len(results)} cases; record one with --save-baseline")
+        return 1
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print(f"\n[!] PERFORMANCE REGRESSION in {len(regressions)} of {compared} cases:")
+        for line in regressions:
+            print(f"[!]   {line}")
+        return 1
+    print(f"\n[+] No regressions in {compared} cases against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
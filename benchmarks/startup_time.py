@@ -0,0 +1,94 @@
+"""
+Startup-Time Benchmark
+======================
+
+Measures what `import fraud_analysis` costs before any work happens: the
+median wall time of a fresh interpreter importing it, and a
+`python -X importtime` breakdown of the slowest top-level imports.
+
+Usage:
+    python benchmarks/startup_time.py [--runs 5] [--top 10] [--budget-ms 800]
+
+With --budget-ms the script exits non-zero when the median import time
+exceeds the budget, so cron hosts and CI can guard the CLI's startup cost.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MODULE = "fraud_analysis"
+
+
+def import_wall_times(runs: int) -> list:
+    """Wall time in ms of `python -c "import fraud_analysis"`, one fresh process per run."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {MODULE}"], cwd=REPO_ROOT, check=True)
+        times.append(1000 * (time.perf_counter() - start))
+    return times
+
+
+def import_breakdown() -> list:
+    """(cumulative ms, self ms, module) for every module imported by the module, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()))
+    return rows
+
+
+def _indent(name: str) -> int:
+    return len(name) - len(name.lstrip())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh-interpreter imports to time")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if the median import exceeds this")
+    args = parser.parse_args(argv)
+
+    rows = import_breakdown()
+    position = next(i for i, row in enumerate(rows) if row[2].strip() == MODULE)
+    own = rows[position]
+    # importtime lists a module's imports just before it, each nesting level
+    # indented by two more spaces
+    top_level = []
+    for row in reversed(rows[:position]):
+        if _indent(row[2]) <= _indent(own[2]):
+            break
+        if _indent(row[2]) == _indent(own[2]) + 2:
+            top_level.append(row)
+    top_level.sort(reverse=True)
+
+    print(f"--- python -X importtime: import {MODULE} ---")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, own_ms, name in top_level[:args.top]:
+        print(f"{cumulative:>14.1f} {own_ms:>9.1f}  {name.strip()}")
+    print(f"{own[0]:>14.1f} {own[1]:>9.1f}  {MODULE} (total)")
+
+    times = import_wall_times(args.runs)
+    median = statistics.median(times)
+    print(f"\nInterpreter start + import, median of {args.runs}: {median:.0f} ms "
+          f"(min {min(times):.0f}, max {max(times):.0f})")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"[!] Startup {median:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Synthetic Transaction Generator
+===============================
+
+Generates Sparkov-style credit card transactions with the fraudTrain.csv
+schema described in DATASET.md, so the pipeline can be benchmarked on
+hosts that cannot download the Kaggle files.
+
+Output is seeded and reproducible: the same seed, row count and chunk size
+give the same rows. Cardholders, merchants, categories and states follow
+the Kaggle cardinalities (about one card per 1,300 transactions, 693
+merchants, 14 categories, 51 states), and fraud (0.58% of rows by default)
+is injected as short bursts on one card: several transactions minutes
+apart (velocity), some of them alternating between the home area and a
+distant state (geo-jump).
+
+Usage:
+    python benchmarks/synthetic_data.py 1000000 data/synthetic_1m.csv [--seed 0] [--fraud-rate 0.0058]
+
+Rows are generated in time-ordered chunks, in parallel worker processes
+when writing CSV, so 100M-row files need no more memory than a few chunks.
+generate() and generate_chunks() return the same rows as DataFrames.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "trans_date_trans_time", "cc_num", "merchant", "category", "amt", "first", "last",
+    "gender", "street", "city", "state", "zip", "lat", "long", "city_pop", "job", "dob",
+    "trans_num", "unix_time", "merch_lat", "merch_long", "is_fraud",
+]
+
+START = np.datetime64("2019-01-01T00:00:00", "s")
+DAYS = 731  # 2019-01-01 .. 2020-12-31
+# Kaggle's unix_time is shifted seven years back from trans_date_trans_time
+UNIX_TIME_OFFSET = -220_924_800
+TXNS_PER_CARD = 1_300
+N_MERCHANTS = 693
+N_CITIES = 894
+N_JOBS = 494
+
+# category -> (share of legitimate transactions, median legitimate amount,
+#              share of fraud, median fraud amount)
+CATEGORIES = {
+    "gas_transport": (0.102, 63.0, 0.082, 12.0),
+    "grocery_pos": (0.095, 101.0, 0.232, 310.0),
+    "home": (0.095, 45.0, 0.026, 255.0),
+    "shopping_pos": (0.090, 33.0, 0.113, 880.0),
+    "kids_pets": (0.087, 40.0, 0.039, 19.0),
+    "shopping_net": (0.075, 42.0, 0.230, 1000.0),
+    "entertainment": (0.072, 44.0, 0.031, 500.0),
+    "food_dining": (0.071, 35.0, 0.020, 120.0),
+    "personal_care": (0.070, 30.0, 0.029, 25.0),
+    "health_fitness": (0.066, 40.0, 0.017, 20.0),
+    "misc_pos": (0.062, 33.0, 0.034, 205.0),
+    "misc_net": (0.049, 30.0, 0.122, 800.0),
+    "grocery_net": (0.035, 52.0, 0.023, 12.0),
+    "travel": (0.031, 6.0, 0.015, 9.0),
+}
+AMOUNT_SIGMA = 0.9
+
+# Share of transactions per hour of day, legitimate vs. fraudulent
+LEGIT_HOURS = np.array([4.2] * 12 + [6.6] * 12)
+FRAUD_HOURS = np.array([9.0, 9.0, 9.0, 9.0] + [0.8] * 18 + [28.0, 28.0])
+
+# state -> (centroid latitude, centroid longitude, population in millions)
+STATES = {
+    "AL": (32.8, -86.8, 5.0), "AK": (61.4, -152.3, 0.7), "AZ": (34.2, -111.7, 7.2),
+    "AR": (34.9, -92.4, 3.0), "CA": (37.2, -119.5, 39.5), "CO": (39.0, -105.5, 5.8),
+    "CT": (41.6, -72.7, 3.6), "DE": (39.0, -75.5, 1.0), "DC": (38.9, -77.0, 0.7),
+    "FL": (28.6, -82.4, 21.5), "GA": (32.7, -83.4, 10.7), "HI": (20.8, -156.3, 1.5),
+    "ID": (44.4, -114.6, 1.8), "IL": (40.0, -89.2, 12.8), "IN": (39.9, -86.3, 6.8),
+    "IA": (42.1, -93.5, 3.2), "KS": (38.5, -98.4, 2.9), "KY": (37.5, -85.3, 4.5),
+    "LA": (31.1, -92.0, 4.7), "ME": (45.4, -69.2, 1.4), "MD": (39.1, -76.8, 6.2),
+    "MA": (42.3, -71.8, 7.0), "MI": (44.3, -85.4, 10.1), "MN": (46.3, -94.3, 5.7),
+    "MS": (32.7, -89.7, 3.0), "MO": (38.4, -92.5, 6.2), "MT": (47.0, -109.6, 1.1),
+    "NE": (41.5, -99.8, 2.0), "NV": (39.3, -116.6, 3.1), "NH": (43.7, -71.6, 1.4),
+    "NJ": (40.2, -74.7, 9.3), "NM": (34.4, -106.1, 2.1), "NY": (42.9, -75.5, 20.2),
+    "NC": (35.6, -79.4, 10.4), "ND": (47.5, -100.5, 0.8), "OH": (40.3, -82.8, 11.8),
+    "OK": (35.6, -97.5, 4.0), "OR": (43.9, -120.6, 4.2), "PA": (40.9, -77.8, 13.0),
+    "RI": (41.7, -71.5, 1.1), "SC": (33.9, -80.9, 5.1), "SD": (44.4, -100.2, 0.9),
+    "TN": (35.9, -86.4, 6.9), "TX": (31.5, -99.3, 29.1), "UT": (39.3, -111.7, 3.3),
+    "VT": (44.1, -72.7, 0.6), "VA": (37.5, -78.8, 8.6), "WA": (47.4, -120.5, 7.7),
+    "WV": (38.6, -80.6, 1.8), "WI": (44.6, -89.9, 5.9), "WY": (43.0, -107.5, 0.6),
+}
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William",
+    "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+    "Charles", "Karen", "Christopher", "Nancy", "Daniel", "Lisa", "Matthew", "Betty", "Anthony",
+    "Margaret", "Mark", "Sandra", "Donald", "Ashley", "Steven", "Kimberly", "Paul", "Emily",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+    "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore",
+    "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King", "Wright", "Scott",
+]
+STREET_NAMES = ["Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park", "River"]
+STREET_SUFFIXES = ["Street", "Avenue", "Road", "Lane", "Drive", "Court", "Way", "Place"]
+CITY_PARTS = ["Spring", "Green", "Fair", "River", "Oak", "Lake", "West", "North", "Mill", "Cedar",
+              "Clear", "Red", "Stone", "Maple", "Sun", "Bright", "Glen", "Ash", "Elk", "Pine"]
+CITY_SUFFIXES = ["field", "ville", "ton", "wood", "dale", "burg", "port", "view", "ford", "haven"]
+CITY_PREFIXES = ["", "New ", "East ", "Lake ", "Mount "]
+JOB_FIELDS = ["Civil", "Mechanical", "Chemical", "Clinical", "Software", "Research", "Retail",
+              "Sales", "Marketing", "Data", "Legal", "Financial", "Museum", "Broadcast", "Forest",
+              "Energy", "Water", "Health", "Tax", "Insurance", "Building", "Transport", "Education"]
+JOB_ROLES = ["engineer", "scientist", "manager", "officer", "analyst", "consultant", "technician",
+             "designer", "surveyor", "therapist", "adviser", "administrator", "buyer", "planner",
+             "inspector", "teacher", "editor", "curator", "broker", "accountant", "assistant", "director"]
+COMPANY_SUFFIXES = ["Inc", "LLC", "Group", "Ltd", "and Sons", "PLC"]
+
+# Byte value -> its two hex digits as two little-endian UTF-32 code units
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8).astype(np.uint64)
+_HEX_PAIRS = _HEX_DIGITS[np.arange(256) >> 4] | (_HEX_DIGITS[np.arange(256) & 15] << np.uint64(32))
+
+
+def _names(parts: list, suffixes: list, count: int, rng: np.random.Generator, sep: str = "") -> np.ndarray:
+    """`count` distinct part+suffix combinations in random order."""
+    combos = np.array([f"{part}{sep}{suffix}" for part in parts for suffix in suffixes], dtype=object)
+    return combos[rng.permutation(len(combos))[:count]]
+
+
+def build_population(n_cards: int, seed: int = 0) -> dict:
+    """
+    Cardholders, cities and merchants shared by every chunk.
+
+    Returns arrays indexed by card id (home attributes as codes into
+    the "values" lists) and merchants grouped by category.
+    """
+    rng = np.random.default_rng([seed, 0])
+    codes = list(STATES)
+    state_pop = np.array([STATES[s][2] for s in codes])
+
+    city_state = rng.choice(len(codes), N_CITIES, p=state_pop / state_pop.sum())
+    centroid = np.array([STATES[s][:2] for s in codes])[city_state]
+    city_lat = (centroid[:, 0] + rng.normal(0, 1.5, N_CITIES)).round(4)
+    city_long = (centroid[:, 1] + rng.normal(0, 2.0, N_CITIES)).round(4)
+    city_pop = np.exp(rng.normal(7.8, 2.0, N_CITIES)).clip(23, 2_900_000).astype(np.int64)
+    city_zip = rng.integers(1_000, 99_950, N_CITIES)
+    city_name = _names([prefix + part for prefix in CITY_PREFIXES for part in CITY_PARTS],
+                       CITY_SUFFIXES, N_CITIES, rng)
+
+    card_city = rng.integers(0, N_CITIES, n_cards)
+    dob = START - (rng.integers(18 * 365, 95 * 365, n_cards) * 86_400).astype("timedelta64[s]")
+    dob_values, dob_codes = np.unique(np.datetime_as_string(dob, unit="D"), return_inverse=True)
+    street = np.array([f"{number} {name} {suffix}" for number, name, suffix in zip(
+        rng.integers(1, 99_999, n_cards),
+        rng.choice(STREET_NAMES, n_cards), rng.choice(STREET_SUFFIXES, n_cards))], dtype=object)
+    street_values, street_codes = np.unique(street, return_inverse=True)
+    cards = {
+        "cc_num": rng.integers(10**15, 5 * 10**18, n_cards),
+        "first": rng.integers(0, len(FIRST_NAMES), n_cards),
+        "last": rng.integers(0, len(LAST_NAMES), n_cards),
+        "gender": rng.integers(0, 2, n_cards),
+        "street": street_codes,
+        "city": card_city,
+        "zip": city_zip[card_city] + rng.integers(0, 50, n_cards),
+        "lat": city_lat[card_city],
+        "long": city_long[card_city],
+        "job": rng.integers(0, N_JOBS, n_cards),
+        "dob": dob_codes,
+    }
+
+    names = list(CATEGORIES)
+    legit_share = np.array([CATEGORIES[c][0] for c in names])
+    per_category = np.maximum(1, np.round(legit_share / legit_share.sum() * N_MERCHANTS).astype(int))
+    merchant_names = _names(LAST_NAMES, [f"-{name}" for name in LAST_NAMES] +
+                            [f" {suffix}" for suffix in COMPANY_SUFFIXES], per_category.sum(), rng)
+    return {
+        "cards": cards,
+        # Some cardholders shop far more than others
+        "card_table": lookup_table(rng.lognormal(0, 0.8, n_cards)),
+        "values": {
+            "first": FIRST_NAMES, "last": LAST_NAMES, "gender": ["F", "M"],
+            "street": list(street_values), "city": list(city_name), "job": list(_names(
+                JOB_FIELDS, JOB_ROLES, N_JOBS, rng, sep=" ")), "dob": list(dob_values),
+            "state": codes, "category": names,
+            "merchant": ["fraud_" + name for name in merchant_names],
+        },
+        "city_state": city_state,
+        "city_pop": city_pop,
+        "state_centroid": np.array([STATES[s][:2] for s in codes]),
+        "merchant_start": np.concatenate([[0], np.cumsum(per_category)[:-1]]),
+        "merchant_count": per_category,
+    }
+
+
+def lookup_table(weights: np.ndarray, slots: int = 1 << 16) -> np.ndarray:
+    """
+    Outcome ids repeated in proportion to weights; indexing it with uniform
+    integers is a weighted draw several times faster than rng.choice(p=...).
+    """
+    slots = max(slots, 16 * len(weights))
+    bounds = np.round(np.cumsum(weights) / np.sum(weights) * slots).astype(np.int64)
+    return np.repeat(np.arange(len(weights)), np.diff(bounds, prepend=0))
+
+
+def _draw(rng: np.random.Generator, table: np.ndarray, size: int) -> np.ndarray:
+    return table[rng.integers(0, len(table), size)]
+
+
+def _times(rng: np.random.Generator, size: int, first_day: int, last_day: int, hours: np.ndarray) -> np.ndarray:
+    """Seconds since START on days [first_day, last_day) with the given hour-of-day profile."""
+    day = rng.integers(first_day, last_day, size)
+    return day * 86_400 + _draw(rng, lookup_table(hours), size) * 3_600 + rng.integers(0, 3_600, size)
+
+
+def _trans_nums(rng: np.random.Generator, size: int) -> np.ndarray:
+    """`size` random 32-digit hex identifiers, built as one fixed-width unicode array."""
+    raw = np.frombuffer(rng.bytes(16 * size), dtype=np.uint8).reshape(size, 16)
+    return np.take(_HEX_PAIRS, raw).view("<U32").ravel()
+
+
+def _fraud_bursts(rng: np.random.Generator, n_fraud: int, n_cards: int, first_day: int,
+                  last_day: int, geo_jump_share: float) -> tuple:
+    """
+    Fraudulent rows as bursts of 2-8 transactions on one card, a few
+    minutes apart. Returns (card id, seconds, is geo-jump row) per row;
+    in a geo-jump burst every other transaction happens in a far-away state.
+    """
+    if n_fraud == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    sizes = rng.integers(2, 9, n_fraud // 2 + 1)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), n_fraud) + 1]
+    sizes[-1] -= sizes.sum() - n_fraud
+    first = np.cumsum(sizes) - sizes
+    burst = np.repeat(np.arange(len(sizes)), sizes)
+    position = np.arange(n_fraud) - first[burst]
+
+    start = _times(rng, len(sizes), first_day, last_day, FRAUD_HOURS)
+    gap = np.where(position > 0, rng.exponential(300, n_fraud).astype(np.int64) + 30, 0)
+    elapsed = np.cumsum(gap)
+    elapsed -= elapsed[first][burst]
+    seconds = np.minimum(start[burst] + elapsed, last_day * 86_400 - 1)
+    card = rng.integers(0, n_cards, len(sizes))[burst]
+    geo_jump = (rng.random(len(sizes)) < geo_jump_share)[burst] & (position % 2 == 1)
+    return card, seconds, geo_jump
+
+
+def generate_chunk(population: dict, n_rows: int, first_day: int, last_day: int,
+                   fraud_rate: float = 0.0058, geo_jump_share: float = 0.3,
+                   rng: np.random.Generator = None) -> pd.DataFrame:
+    """
+    `n_rows` transactions dated on days [first_day, last_day) after
+    2019-01-01, sorted by time; string columns are categoricals.
+    """
+    rng = rng or np.random.default_rng()
+    cards, values = population["cards"], population["values"]
+    n_fraud = int(round(n_rows * fraud_rate))
+    n_legit = n_rows - n_fraud
+
+    fraud_card, fraud_seconds, geo_jump = _fraud_bursts(
+        rng, n_fraud, len(cards["cc_num"]), first_day, last_day, geo_jump_share)
+    card = np.concatenate([_draw(rng, population["card_table"], n_legit), fraud_card])
+    seconds = np.concatenate([_times(rng, n_legit, first_day, last_day, LEGIT_HOURS), fraud_seconds])
+    is_fraud = np.repeat(np.array([0, 1], dtype=np.int8), [n_legit, n_fraud])
+    geo_jump = np.concatenate([np.zeros(n_legit, dtype=bool), geo_jump])
+
+    shares = np.array([spec[0] for spec in CATEGORIES.values()])
+    fraud_shares = np.array([spec[2] for spec in CATEGORIES.values()])
+    category = np.concatenate([_draw(rng, lookup_table(shares), n_legit),
+                               _draw(rng, lookup_table(fraud_shares), n_fraud)])
+    merchant = population["merchant_start"][category] + (
+        rng.random(n_rows) * population["merchant_count"][category]).astype(np.int64)
+    median = np.where(is_fraud == 1,
+                      np.array([spec[3] for spec in CATEGORIES.values()])[category],
+                      np.array([spec[1] for spec in CATEGORIES.values()])[category])
+    amt = np.maximum(1.0, median * rng.lognormal(0, AMOUNT_SIGMA, n_rows)).round(2)
+
+    order = np.argsort(seconds)
+    card, seconds, is_fraud, geo_jump = card[order], seconds[order], is_fraud[order], geo_jump[order]
+    category, merchant, amt = category[order], merchant[order], amt[order]
+
+    lat, long = cards["lat"][card], cards["long"][card]
+    far_state = rng.integers(0, len(values["state"]), n_rows)
+    merch_lat = np.where(geo_jump, population["state_centroid"][far_state, 0], lat) + rng.uniform(-1, 1, n_rows)
+    merch_long = np.where(geo_jump, population["state_centroid"][far_state, 1], long) + rng.uniform(-1, 1, n_rows)
+    city = cards["city"][card]
+
+    def categorical(codes: np.ndarray, key: str) -> pd.Categorical:
+        return pd.Categorical.from_codes(codes, categories=values[key])
+
+    timestamps = START + seconds.astype("timedelta64[s]")
+    return pd.DataFrame({
+        "trans_date_trans_time": timestamps,
+        "cc_num": cards["cc_num"][card],
+        "merchant": categorical(merchant, "merchant"),
+        "category": categorical(category, "category"),
+        "amt": amt,
+        "first": categorical(cards["first"][card], "first"),
+        "last": categorical(cards["last"][card], "last"),
+        "gender": categorical(cards["gender"][card], "gender"),
+        "street": categorical(cards["street"][card], "street"),
+        "city": categorical(city, "city"),
+        "state": categorical(population["city_state"][city], "state"),
+        "zip": cards["zip"][card],
+        "lat": lat,
+        "long": long,
+        "city_pop": population["city_pop"][city],
+        "job": categorical(cards["job"][card], "job"),
+        "dob": categorical(cards["dob"][card], "dob"),
+        "trans_num": _trans_nums(rng, n_rows),
+        "unix_time": timestamps.astype(np.int64) + UNIX_TIME_OFFSET,
+        "merch_lat": merch_lat.round(6),
+        "merch_long": merch_long.round(6),
+        "is_fraud": is_fraud,
+    }, columns=COLUMNS)
+
+
+def _chunk_bounds(n_rows: int, chunk_rows: int) -> list:
+    """
+    (first row, end row, first day, end day) per chunk: the two years split
+    into whole-day windows of about `chunk_rows` rows (at most one per day).
+    """
+    n_chunks = min(DAYS, max(1, -(-n_rows // chunk_rows)))
+    day_bounds = np.round(np.linspace(0, DAYS, n_chunks + 1)).astype(int)
+    row_bounds = np.round(day_bounds / DAYS * n_rows).astype(int)
+    return [(row_bounds[i], row_bounds[i + 1], day_bounds[i], day_bounds[i + 1]) for i in range(n_chunks)]
+
+
+_POPULATIONS = {}
+
+
+def _chunk(n_rows: int, seed: int, index: int, chunk_rows: int, fraud_rate: float,
+           geo_jump_share: float) -> pd.DataFrame:
+    """Chunk `index` of an n_rows dataset; depends only on the arguments, so any process can build it."""
+    key = (max(100, n_rows // TXNS_PER_CARD), seed)
+    if key not in _POPULATIONS:
+        _POPULATIONS.clear()
+        _POPULATIONS[key] = build_population(*key)
+    first_row, end_row, first_day, end_day = _chunk_bounds(n_rows, chunk_rows)[index]
+    chunk = generate_chunk(_POPULATIONS[key], end_row - first_row, first_day, end_day,
+                           fraud_rate, geo_jump_share, np.random.default_rng([seed, index + 1]))
+    chunk.index = pd.RangeIndex(first_row, end_row)
+    return chunk
+
+
+def generate_chunks(n_rows: int, seed: int = 0, chunk_rows: int = 1_000_000,
+                    fraud_rate: float = 0.0058, geo_jump_share: float = 0.3):
+    """
+    Yield DataFrames totalling `n_rows` transactions in time order, numbered
+    by a RangeIndex that continues across chunks like the CSV's unnamed column.
+    """
+    for index in range(len(_chunk_bounds(n_rows, chunk_rows))):
+        yield _chunk(n_rows, seed, index, chunk_rows, fraud_rate, geo_jump_share)
+
+
+def generate(n_rows: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """All `n_rows` transactions as one in-memory DataFrame."""
+    return pd.concat(generate_chunks(n_rows, seed, **kwargs))
+
+
+def _chunk_csv(args: tuple) -> tuple:
+    """(CSV text of one chunk, generate seconds, format seconds)."""
+    start = time.perf_counter()
+    chunk = _chunk(*args)
+    generated = time.perf_counter()
+    text = chunk.to_csv(header=args[2] == 0)
+    return text, generated - start, time.perf_counter() - generated
+
+
+def write_csv(path: str, n_rows: int, seed: int = 0, chunk_rows: int = 1_000_000,
+              fraud_rate: float = 0.0058, geo_jump_share: float = 0.3,
+              workers: Optional[int] = None) -> dict:
+    """
+    Write `n_rows` transactions to path in the fraudTrain.csv layout.
+
+    Formatting CSV text is far slower than generating the rows, so chunks
+    are generated and formatted in `workers` processes (default: one per
+    CPU) and appended to the file in order. Returns the summed generate
+    and format seconds and the elapsed seconds.
+    """
+    tasks = [(n_rows, seed, index, chunk_rows, fraud_rate, geo_jump_share)
+             for index in range(len(_chunk_bounds(n_rows, chunk_rows)))]
+    timings = {"generate_s": 0.0, "format_s": 0.0}
+    start = time.perf_counter()
+    with open(path, "w", newline="") as fh, ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+        for text, generate_s, format_s in pool.map(_chunk_csv, tasks):
+            fh.write(text)
+            timings["generate_s"] += generate_s
+            timings["format_s"] += format_s
+    timings["elapsed_s"] = time.perf_counter() - start
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("rows", type=int, help="number of transactions")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fraud-rate", type=float, default=0.0058, help="share of fraudulent rows")
+    parser.add_argument("--geo-jump-share", type=float, default=0.3,
+                        help="share of fraud bursts that jump between distant states")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows generated per chunk")
+    parser.add_argument("--workers", type=int, help="processes generating chunks (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    timings = write_csv(args.output, args.rows, args.seed, chunk_rows=args.chunk_rows,
+                        fraud_rate=args.fraud_rate, geo_jump_share=args.geo_jump_share, workers=args.workers)
+    print(f"[+] Wrote {args.rows:,} rows to {args.output} in {timings['elapsed_s']:.1f}s "
+          f"(generation {args.rows / max(timings['generate_s'], 1e-9):,.0f} rows/s per process, "
+          f"CSV formatting {args.rows / max(timings['format_s'], 1e-9):,.0f} rows/s per process)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,30 +16,220 @@ https://www.kaggle.com/datasets/kartik2112/fraud-detection
 import pandas as pd
 import numpy as np
 import sqlite3
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import glob
+import hashlib
+import io
+import json
 import os
+import re
+import shutil
+import sys
+import time
+import uuid
+import threading
 import warnings
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Optional
+
+try:
+    import resource  # peak RSS for the run report; not available on Windows
+except ImportError:
+    resource = None
 
 warnings.filterwarnings("ignore")
-sns.set_theme(style="whitegrid")
 
 
 # ──────────────────────────────────────────────────────────
 # 1. LOAD DATA INTO SQLITE
 # ──────────────────────────────────────────────────────────
 
-def load_data(filepath: str = "data/fraudTrain.csv", db_path: str = ":memory:") -> sqlite3.Connection:
+DEFAULT_CHUNKSIZE = 250_000
+# Processes that parse CSV pieces by default. Each holds a piece of up to
+# DEFAULT_CHUNKSIZE rows, so more of them buy memory use, not speed, once
+# the single SQLite writer is saturated.
+DEFAULT_WORKERS = min(os.cpu_count() or 1, 4)
+DEFAULT_DB_PATH = "data/fraud_cache.sqlite"
+
+# Bump whenever derive_columns, the dtype schema, the table layout or the
+# INDEXES change so persistent databases built by older code are rebuilt.
+DERIVATION_VERSION = 10
+
+# Declared on-load schema. Low-cardinality strings become categoricals and
+# numerics are narrowed to the smallest type that holds the dataset's values
+# exactly: cc_num needs 16 digits, so it stays int64, and only the cardholder
+# lat/long (at most 7 significant digits) fit float32. amt (8+ digits from
+# $100,000.00) and merch_lat/merch_long (6 decimals) stay float64.
+CSV_DTYPES = {
+    "cc_num": "int64",
+    "merchant": "category",
+    "category": "category",
+    "amt": "float64",
+    "gender": "category",
+    "city": "category",
+    "state": "category",
+    "zip": "int32",
+    "lat": "float32",
+    "long": "float32",
+    "city_pop": "int32",
+    "job": "category",
+    "dob": "category",  # a few thousand distinct dates, each parsed once in derive_columns
+    "unix_time": "int64",
+    "merch_lat": "float64",
+    "merch_long": "float64",
+    "is_fraud": "int8",
+}
+
+# Cardholder PII that none of the analyses read
+PII_COLUMNS = ["first", "last", "street"]
+
+# float32 holds ~7.2 significant decimal digits; widening back to float64
+# at this precision recovers the CSV's original values (41.161, not 41.160999)
+FLOAT32_SIGNIFICANT_DIGITS = 7
+
+# SQLite column types for the transactions table: the typed schema from
+# fraud_detection_queries.sql mapped to SQLite storage classes, followed by
+# the columns added in derive_columns and the CSV each row was loaded from.
+# Timestamps are stored as INTEGER seconds since 1970-01-01 (the CSV's local
+# times read as UTC), so MIN/MAX, range filters and time windows compare
+# integers; queries format them with datetime(col, 'unixepoch') for output.
+# The DIMENSIONS columns are stored as integer keys (see below).
+TRANSACTIONS_SCHEMA = {
+    "trans_date_trans_time": "INTEGER",
+    "cc_num": "INTEGER",
+    "merchant_id": "INTEGER",
+    "category_id": "INTEGER",
+    "amt": "REAL",
+    "first": "TEXT",
+    "last": "TEXT",
+    "gender": "TEXT",
+    "street": "TEXT",
+    "city_id": "INTEGER",
+    "state_id": "INTEGER",
+    "zip": "INTEGER",
+    "lat": "REAL",
+    "long": "REAL",
+    "city_pop": "INTEGER",
+    "job_id": "INTEGER",
+    "dob": "INTEGER",
+    "trans_num": "TEXT",
+    "unix_time": "INTEGER",
+    "merch_lat": "REAL",
+    "merch_long": "REAL",
+    "is_fraud": "INTEGER",
+    "txn_hour": "INTEGER",
+    "txn_day_of_week": "INTEGER",
+    "txn_month": "TEXT",
+    "age": "INTEGER",
+    "age_group": "TEXT",
+    "amount_bucket": "TEXT",
+    "city_size": "TEXT",
+    "source_file": "TEXT",
+}
+
+# Load-time PRAGMAs: no rollback journal, no fsync, a 256 MB page cache and
+# in-memory temp structures. The previous values are restored afterwards.
+LOAD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": -262_144,
+    "temp_store": "MEMORY",
+}
+
+# Appends write into a database that already holds history, so they keep
+# the rollback journal and fsyncs and only enlarge the caches.
+APPEND_PRAGMAS = {
+    "cache_size": -262_144,
+    "temp_store": "MEMORY",
+}
+
+# Cardholder attributes: constant for a cc_num, so BulkLoader stores them
+# once per card in the CARDS_TABLE (keyed by cc_num) instead of on every
+# transaction. A card's first row wins; rows that disagree are reported.
+CARD_COLUMNS = ["first", "last", "gender", "street", "city", "state", "zip", "lat", "long",
+                "city_pop", "job", "dob", "city_size"]
+CARDS_TABLE = "cards"
+
+# Repeated strings that are stored once in a dimension table each
+# (dim_<column>: <column>_id INTEGER PRIMARY KEY, <column> TEXT UNIQUE).
+# The transactions fact table holds only the <column>_id keys, so grouping
+# on them compares integers; NAMED_VIEW joins the names back for queries
+# that need them, together with the CARDS_TABLE columns.
+DIMENSIONS = ["merchant", "category", "state", "city", "job"]
+NAMED_VIEW = "transactions_named"
+
+# One row per transaction: append_data relies on this index to find and
+# reject trans_num values that are already stored.
+TRANS_NUM_INDEX = "idx_trans_num"
+
+
+def _read_csv_kwargs(keep_pii: bool = False) -> dict:
+    """Arguments for pd.read_csv that apply the declared compact schema."""
+    dropped = set() if keep_pii else set(PII_COLUMNS)
+
+    def usecols(name: str) -> bool:
+        name = name.strip().lower()
+        # The Kaggle export carries an unnamed row-index column
+        return name not in dropped and not name.startswith("unnamed")
+
+    return {
+        "usecols": usecols,
+        "dtype": CSV_DTYPES,
+        "parse_dates": ["trans_date_trans_time"],
+    }
+
+
+def _widen_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert float32 columns back to float64 so SQLite stores the CSV's values."""
+    for col in df.columns[df.dtypes == "float32"]:
+        values = df[col].to_numpy(dtype="float64")
+        with np.errstate(divide="ignore"):
+            magnitude = np.floor(np.log10(np.abs(values)))
+        magnitude[~np.isfinite(magnitude)] = 0
+        scale = 10.0 ** (FLOAT32_SIGNIFICANT_DIGITS - 1 - magnitude)
+        df[col] = np.round(values * scale) / scale
+    return df
+
+
+def dtype_memory_report(filepath: str = "data/fraudTrain.csv", nrows: int = 100_000) -> pd.DataFrame:
     """
-    Load CSV into SQLite and return connection.
+    Compare per-column memory of a CSV sample with inferred vs declared dtypes.
 
-    Uses in-memory DB by default for speed and no leftover files.
-    Pass a file path to db_path for persistence.
+    Reads the first `nrows` rows twice and prints a before/after table.
     """
-    print(f"Loading data from {filepath}...")
-    df = pd.read_csv(filepath, parse_dates=["trans_date_trans_time"])
-    print(f"Raw shape: {df.shape}")
+    before = pd.read_csv(filepath, nrows=nrows, parse_dates=["trans_date_trans_time"])
+    before.columns = before.columns.str.strip().str.lower()
+    after = pd.read_csv(filepath, nrows=nrows, **_read_csv_kwargs())
+
+    report = pd.DataFrame({
+        "inferred_dtype": before.dtypes.astype(str),
+        "inferred_mb": before.memory_usage(index=False, deep=True) / 1e6,
+        "declared_dtype": after.dtypes.astype(str),
+        "declared_mb": after.memory_usage(index=False, deep=True) / 1e6,
+    }).loc[before.columns]
+    report["declared_dtype"] = report["declared_dtype"].fillna("(dropped)")
+    report["declared_mb"] = report["declared_mb"].fillna(0.0)
+    report = report.round(3)
+
+    total_before = report["inferred_mb"].sum()
+    total_after = report["declared_mb"].sum()
+    print(f"\n--- Memory by Column ({len(before):,}-row sample) ---")
+    print(report.to_string())
+    print(f"  Inferred: {total_before:.1f} MB   Declared: {total_after:.1f} MB   "
+          f"Reduction: {100 * (1 - total_after / total_before):.1f}%")
+    return report
+
+
+def derive_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the derived analysis columns to a raw transactions frame in place.
 
+    Every derived value depends only on its own row, so this can be applied
+    to each chunk of a streamed CSV independently. dob strings are parsed
+    once per distinct date and copied to the rows that carry it.
+    """
     # Standardize column names
     df.columns = df.columns.str.strip().str.lower()
 
@@ -48,9 +238,19 @@ def load_data(filepath: str = "data/fraudTrain.csv", db_path: str = ":memory:")
     df["txn_day_of_week"] = df["trans_date_trans_time"].dt.dayofweek  # 0=Mon, 6=Sun
     df["txn_month"] = df["trans_date_trans_time"].dt.to_period("M").astype(str)
 
-    # Age at time of transaction
-    df["dob"] = pd.to_datetime(df["dob"])
-    df["age"] = ((df["trans_date_trans_time"] - df["dob"]).dt.days / 365.25).astype(int)
+    # Each distinct date is parsed once; code -1 (missing) picks the trailing NaT
+    codes, dates = pd.factorize(df["dob"])
+    dob = np.append(pd.to_datetime(dates).to_numpy("datetime64[s]"), np.datetime64("NaT", "s"))[codes]
+    df["dob"] = dob
+    df["city_size"] = pd.cut(
+        df["city_pop"], bins=[0, 10_000, 100_000, 500_000, float("inf")],
+        labels=["Rural (<10K)", "Small (10K-100K)", "Mid (100K-500K)", "Large (500K+)"],
+    )
+
+    # Age at time of transaction, in whole days then years
+    txn_seconds = df["trans_date_trans_time"].to_numpy("datetime64[s]").view("int64")
+    days = (txn_seconds - dob.view("int64")) // 86_400
+    df["age"] = (days / 365.25).astype(int)
     df["age_group"] = pd.cut(
         df["age"], bins=[0, 25, 35, 45, 55, 65, 120],
         labels=["18-24", "25-34", "35-44", "45-54", "55-64", "65+"],
@@ -61,26 +261,886 @@ def load_data(filepath: str = "data/fraudTrain.csv", db_path: str = ":memory:")
         df["amt"], bins=[0, 100, 500, 1000, float("inf")],
         labels=["0-100", "100-500", "500-1000", "1000+"],
     )
+    return df
 
-    # City size
-    df["city_size"] = pd.cut(
-        df["city_pop"], bins=[0, 10_000, 100_000, 500_000, float("inf")],
-        labels=["Rural (<10K)", "Small (10K-100K)", "Mid (100K-500K)", "Large (500K+)"],
+
+def _sql_values(series: pd.Series) -> list:
+    """Column values as Python objects that sqlite3 can bind (NULL for missing)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Stored as epoch seconds (see TRANSACTIONS_SCHEMA)
+        seconds = series.to_numpy(dtype="datetime64[s]").view("int64")
+        if not series.hasnans:
+            return seconds.tolist()
+        series = pd.Series(pd.arrays.IntegerArray(seconds, series.isna().to_numpy()), index=series.index)
+    elif pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+        if not series.hasnans:
+            return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class BulkLoader:
+    """
+    Bulk writer for the transactions table.
+
+    Used as a context manager around a whole load: on entry it applies
+    `pragmas` and opens a single transaction, append() creates the table
+    from TRANSACTIONS_SCHEMA (plus the CARDS_TABLE, the DIMENSIONS tables
+    and NAMED_VIEW) on first use and inserts each frame with one
+    executemany over column-major tuples, and on exit it commits, restores
+    the connection's previous PRAGMA values and reports insert throughput.
+
+    CARD_COLUMNS go to the CARDS_TABLE, once per card, and DIMENSIONS
+    columns are replaced by their integer keys on the way in; values not
+    seen before are added to their dimension table. Cards whose rows carry
+    different CARD_COLUMNS values than the stored ones (from the same frame
+    or an earlier one) keep their first values, and a warning on exit names
+    the columns that disagreed.
+
+    With replace=False existing tables are kept and rows go in with
+    INSERT OR IGNORE, so the TRANS_NUM_INDEX silently drops duplicates.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, table: str = "transactions",
+                 replace: bool = True, pragmas: Optional[dict] = None):
+        self.conn = conn
+        self.table = table
+        self.replace = replace
+        self.pragmas = LOAD_PRAGMAS if pragmas is None else pragmas
+        self.rows = 0
+        self.seconds = 0.0
+        self._inserts = {}  # table -> (INSERT statement, its columns)
+        self._saved_pragmas = {}
+        self._keys = {}
+        self._cards = set()
+        self._conflicts = {}  # cc_num -> CARD_COLUMNS whose values disagreed
+
+    def __enter__(self) -> "BulkLoader":
+        for name, value in self.pragmas.items():
+            self._saved_pragmas[name] = self.conn.execute(f"PRAGMA {name}").fetchone()[0]
+            self.conn.execute(f"PRAGMA {name} = {value}")
+        self.conn.execute("BEGIN")
+        if not self.replace:
+            for table in (self.table, CARDS_TABLE):
+                existing = [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+                if existing:
+                    self._prepare_insert(table, existing, "INSERT OR IGNORE")
+                for column in DIMENSIONS:
+                    if f"{column}_id" in existing:
+                        self._keys[column] = dict(self.conn.execute(
+                            f"SELECT {column}, {column}_id FROM dim_{column}").fetchall())
+            if CARDS_TABLE in self._inserts:
+                self._cards = {row[0] for row in self.conn.execute(f"SELECT cc_num FROM {CARDS_TABLE}")}
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        for name, value in self._saved_pragmas.items():
+            self.conn.execute(f"PRAGMA {name} = {value}")
+        if exc_type is None and self.rows:
+            rate = self.rows / self.seconds if self.seconds else float("inf")
+            print(f"[+] Inserted {self.rows:,} rows in {self.seconds:.1f}s ({rate:,.0f} rows/sec)")
+        if exc_type is None and self._conflicts:
+            columns = sorted(set().union(*self._conflicts.values()))
+            print(f"[!] {len(self._conflicts):,} cards have rows that disagree on {', '.join(columns)}; "
+                  f"the {CARDS_TABLE} table keeps each card's first values")
+
+    def _create_tables(self, columns: list) -> None:
+        card_columns = [col for col in columns if col in CARD_COLUMNS]
+        tables = {self.table: [col for col in columns if col not in card_columns]}
+        if card_columns:
+            tables[CARDS_TABLE] = ["cc_num"] + card_columns
+        self.conn.execute(f"DROP VIEW IF EXISTS {NAMED_VIEW}")
+        for table, table_columns in tables.items():
+            stored = [f"{col}_id" if col in DIMENSIONS else col for col in table_columns]
+            types = dict(TRANSACTIONS_SCHEMA, cc_num="INTEGER PRIMARY KEY") if table == CARDS_TABLE \
+                else TRANSACTIONS_SCHEMA
+            column_defs = ",\n    ".join(f'"{col}" {types.get(col, "")}'.rstrip() for col in stored)
+            self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.conn.execute(f'CREATE TABLE "{table}" (\n    {column_defs}\n)')
+            self._prepare_insert(table, stored, "INSERT OR IGNORE" if table == CARDS_TABLE else "INSERT")
+
+        dimensions = [col for col in columns if col in DIMENSIONS]
+        for column in dimensions:
+            self.conn.execute(f"DROP TABLE IF EXISTS dim_{column}")
+            self.conn.execute(
+                f"CREATE TABLE dim_{column} ({column}_id INTEGER PRIMARY KEY, {column} TEXT UNIQUE)")
+            self._keys[column] = {}
+        joins = f"\n    LEFT JOIN {CARDS_TABLE} USING (cc_num)" if CARDS_TABLE in tables else ""
+        joins += "".join(f"\n    LEFT JOIN dim_{col} USING ({col}_id)" for col in dimensions)
+        self.conn.execute(f"""
+            CREATE VIEW {NAMED_VIEW} AS
+            SELECT t.rowid AS rowid, {", ".join(f'"{col}"' for col in columns)}
+            FROM "{self.table}" AS t{joins}
+        """)
+
+    def _prepare_insert(self, table: str, columns: list, verb: str) -> None:
+        placeholders = ", ".join("?" * len(columns))
+        quoted = ", ".join(f'"{col}"' for col in columns)
+        self._inserts[table] = (f'{verb} INTO "{table}" ({quoted}) VALUES ({placeholders})', list(columns))
+
+    def _dimension_keys(self, column: str, series: pd.Series) -> pd.Series:
+        """Integer keys of a DIMENSIONS column's values, adding unseen values to dim_<column>."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, values = pd.factorize(series)
+        keys = self._keys[column]
+        new = [value for value in dict.fromkeys(values) if value not in keys]
+        if new:
+            added = {value: len(keys) + i + 1 for i, value in enumerate(new)}
+            self.conn.executemany(f"INSERT INTO dim_{column} VALUES (?, ?)",
+                                  [(key, value) for value, key in added.items()])
+            keys.update(added)
+        lookup = np.array([keys[value] for value in values] + [0], dtype=np.int64)
+        # Codes of -1 (missing values) pick the trailing slot and become NULL
+        return pd.Series(pd.arrays.IntegerArray(lookup[codes], codes == -1), index=series.index)
+
+    def _column_values(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """The values of table column `column` for the rows of df."""
+        name = column[:-len("_id")]
+        if column.endswith("_id") and name in self._keys:
+            return self._dimension_keys(name, df[name])
+        return df[column]
+
+    def _insert(self, table: str, df: pd.DataFrame) -> int:
+        sql, columns = self._inserts[table]
+        values = [_sql_values(self._column_values(df, col)) for col in columns]
+        return self.conn.executemany(sql, zip(*values)).rowcount
+
+    def _note_conflicts(self, cc_nums, column: str) -> None:
+        for cc_num in cc_nums:
+            self._conflicts.setdefault(cc_num, set()).add(column)
+
+    def _check_cards(self, df: pd.DataFrame, first: np.ndarray) -> None:
+        """
+        Record cards whose rows in df disagree on a CARD_COLUMNS value, with
+        each other or with the card's stored row. `first` holds the
+        positions of each card's first row.
+        """
+        codes, _ = pd.factorize(df["cc_num"])
+        cc_nums = df["cc_num"].to_numpy()
+        for column in CARD_COLUMNS:
+            if column not in df.columns:
+                continue
+            series = df[column]
+            values = series.cat.codes.to_numpy() if isinstance(series.dtype, pd.CategoricalDtype) \
+                else series.to_numpy()
+            expected = values[first][codes]
+            differ = (values != expected) & ~(pd.isna(values) & pd.isna(expected))
+            if differ.any():
+                self._note_conflicts(set(cc_nums[differ].tolist()), column)
+
+        known = df.iloc[first]
+        known = known[known["cc_num"].isin(list(self._cards)).to_numpy()]
+        if not len(known):
+            return
+        _, columns = self._inserts[CARDS_TABLE]
+        quoted = ", ".join(f'"{col}"' for col in columns)
+        stored = {row[0]: row for row in self.conn.execute(
+            f'SELECT {quoted} FROM "{CARDS_TABLE}" WHERE cc_num IN (SELECT value FROM json_each(?))',
+            (json.dumps(known["cc_num"].tolist()),))}
+        new = zip(*[_sql_values(self._column_values(known, col)) for col in columns])
+        for row in new:
+            for column, value, old in zip(columns, row, stored[row[0]]):
+                if value != old:
+                    self._note_conflicts([row[0]], column.removesuffix("_id"))
+
+    def append(self, df: pd.DataFrame) -> int:
+        """Insert every row of df (the first frame fixes new tables' columns); returns rows inserted."""
+        if not self._inserts:
+            self._create_tables(list(df.columns))
+        start = time.perf_counter()
+        if CARDS_TABLE in self._inserts:
+            first = np.flatnonzero(~df["cc_num"].duplicated().to_numpy())
+            self._check_cards(df, first)
+            cards = df.iloc[first]
+            cards = cards[~cards["cc_num"].isin(list(self._cards)).to_numpy()]
+            if len(cards):
+                self._insert(CARDS_TABLE, cards)
+                self._cards.update(cards["cc_num"].tolist())
+        inserted = self._insert(self.table, df)
+        self.seconds += time.perf_counter() - start
+        self.rows += inserted
+        return inserted
+
+
+def source_fingerprint(filepath: str, with_hash: bool = True) -> dict:
+    """Size, mtime and (optionally) SHA-256 of a source file."""
+    stat = os.stat(filepath)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+def _read_meta(conn: sqlite3.Connection) -> dict:
+    """Return the load metadata stored in a database, or {} if there is none."""
+    try:
+        rows = conn.execute("SELECT key, value FROM _load_meta").fetchall()
+    except sqlite3.DatabaseError:
+        return {}
+    return {key: json.loads(value) for key, value in rows}
+
+
+def _write_meta(conn: sqlite3.Connection, meta: dict) -> None:
+    conn.execute("CREATE TABLE IF NOT EXISTS _load_meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(
+        "INSERT OR REPLACE INTO _load_meta (key, value) VALUES (?, ?)",
+        [(key, json.dumps(value)) for key, value in meta.items()],
     )
+    conn.commit()
 
+
+def _cache_is_fresh(stored: dict, filepaths: list, keep_pii: bool) -> bool:
+    """
+    True if a database's metadata matches the current source files and code.
+
+    Size and mtime are compared first so a changed file is detected without
+    hashing it; content hashes are only computed when all of them still match.
+    """
+    sources = stored.get("sources")
+    paths = [os.path.abspath(path) for path in filepaths]
+    if (stored.get("derivation_version") != DERIVATION_VERSION
+            or stored.get("keep_pii") != keep_pii
+            or not sources or sorted(sources) != sorted(paths)):
+        return False
+    for path in paths:
+        current = source_fingerprint(path, with_hash=False)
+        if (current["size"], current["mtime_ns"]) != (sources[path]["size"], sources[path]["mtime_ns"]):
+            return False
+    return all(source_fingerprint(path)["sha256"] == sources[path]["sha256"] for path in paths)
+
+
+# Column the Parquet cache is partitioned on (one hive-style directory per month)
+PARQUET_PARTITION = "txn_month"
+PARQUET_META_FILE = "_cache.json"  # leading "_" keeps it out of dataset discovery
+
+
+def _pyarrow(feature: str = "The Parquet cache"):
+    """Import pyarrow on first use; only the Parquet cache and the query cache's disk tier need it."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(f"{feature} requires pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def write_parquet_chunk(df: pd.DataFrame, parquet_dir: str, part: str) -> None:
+    """
+    Add one enriched chunk to the Parquet dataset in parquet_dir, split
+    into its PARQUET_PARTITION directories as part-<part>-*.parquet files. Categorical columns are
+    written as dictionary-encoded strings and read back as categoricals.
+    """
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa.parquet.write_to_dataset(table, parquet_dir, partition_cols=[PARQUET_PARTITION],
+                                basename_template=f"part-{part}-{{i}}.parquet")
+
+
+def read_parquet_cache(parquet_dir: str, columns: Optional[list] = None,
+                       months: Optional[list] = None) -> pd.DataFrame:
+    """
+    Read `columns` (default: all) of the Parquet cache into a DataFrame.
+
+    Only the requested column chunks are read, and with `months`
+    ('YYYY-MM' strings) the other month directories are never opened.
+    """
+    pa = _pyarrow()
+    filters = [(PARQUET_PARTITION, "in", list(months))] if months is not None else None
+    return pa.parquet.read_table(parquet_dir, columns=columns, filters=filters).to_pandas()
+
+
+def _parquet_is_current(parquet_dir: str, db_uid: Optional[str]) -> bool:
+    """Whether parquet_dir holds the rows of the database load identified by db_uid."""
+    try:
+        with open(os.path.join(parquet_dir, PARQUET_META_FILE)) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    return meta.get("db_uid") == db_uid and meta.get("derivation_version") == DERIVATION_VERSION
+
+
+def _parquet_cache_entries(parquet_dir: str) -> list:
+    """
+    Paths of the Parquet cache in parquet_dir: its month partitions and
+    PARQUET_META_FILE. Raises ValueError if the directory holds anything
+    else, so a mistyped --parquet never deletes unrelated files.
+    """
+    if not os.path.isdir(parquet_dir):
+        return []
+    entries = os.listdir(parquet_dir)
+    foreign = [name for name in entries
+               if name != PARQUET_META_FILE and not name.startswith(f"{PARQUET_PARTITION}=")]
+    if foreign:
+        raise ValueError(f"{parquet_dir} is not a Parquet cache directory (it contains {foreign[0]}); "
+                         "choose an empty or new directory")
+    return [os.path.join(parquet_dir, name) for name in entries]
+
+
+def _clear_parquet_cache(parquet_dir: str) -> None:
+    """Remove the Parquet cache's partitions and meta file, leaving the directory itself."""
+    for path in _parquet_cache_entries(parquet_dir):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+def expand_sources(filepath) -> list:
+    """
+    CSV paths named by filepath: a path, a glob pattern such as
+    'data/monthly/*.csv', or a list of either. Glob matches are sorted;
+    a file named twice is loaded once.
+    """
+    patterns = [filepath] if isinstance(filepath, str) else list(filepath)
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if any(ch in pattern for ch in "*?[") else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No files match {pattern}")
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def _csv_pieces(filepath: str, chunksize: Optional[int]) -> tuple:
+    """
+    (column names, [(start, end), ...]) for a CSV: byte ranges of about
+    `chunksize` rows each that begin and end on line boundaries (the whole
+    body for chunksize=None). Row sizes are estimated from the first MB,
+    and rows are assumed not to contain quoted newlines.
+    """
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as fh:
+        header = fh.readline()
+        bounds = [fh.tell()]
+        if chunksize is not None:
+            sample = fh.read(1 << 20)
+            step = max(len(sample) // max(sample.count(b"\n"), 1), 1) * chunksize
+            while bounds[-1] + step < size:
+                fh.seek(bounds[-1] + step)
+                fh.readline()
+                bounds.append(fh.tell())
+        bounds.append(size)
+    names = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    return names, [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _enrich_piece(filepath: str, names: list, start: int, end: int, keep_pii: bool) -> tuple:
+    """
+    Parse bytes start..end of a CSV and add the derived columns and
+    source_file; returns (chunk, its count_by_keys, {stage: measure record}).
+    Runs in load_data's worker processes.
+    """
+    records = {}
+    with measure() as records["load:csv_parse"]:
+        with open(filepath, "rb") as fh:
+            fh.seek(start)
+            data = fh.read(end - start)
+        chunk = pd.read_csv(io.BytesIO(data), header=None, names=names, **_read_csv_kwargs(keep_pii))
+        records["load:csv_parse"]["rows"] = len(chunk)
+    with measure(len(chunk)) as records["load:derive_columns"]:
+        derive_columns(chunk)
+        _widen_floats(chunk)
+        chunk["source_file"] = pd.Categorical.from_codes(np.zeros(len(chunk), dtype=np.int8), [filepath])
+    with measure(len(chunk)) as records["load:rate_counters"]:
+        counts = count_by_keys(chunk)
+    return chunk, counts, records
+
+
+def _enriched_pieces(tasks: list, workers: int):
+    """
+    Yield _enrich_piece(*task) for each task, in order. With workers > 1
+    the pieces are parsed in a process pool, at most one per worker ahead
+    of the consumer, so no more than workers + 1 pieces are held at once.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _enrich_piece(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_enrich_piece, *task))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_data(filepath="data/fraudTrain.csv", db_path: str = ":memory:",
+              chunksize: Optional[int] = DEFAULT_CHUNKSIZE, keep_pii: bool = False,
+              use_cache: bool = True, indexes: bool = True,
+              parquet_dir: Optional[str] = None, workers: Optional[int] = None) -> sqlite3.Connection:
+    """
+    Load CSV into SQLite and return connection.
+
+    Uses in-memory DB by default for speed and no leftover files.
+    Pass a file path to db_path for persistence.
+
+    filepath may be a single CSV, a glob pattern or a list of either (see
+    expand_sources), e.g. fraudTrain.csv plus fraudTest.csv or one file per
+    month. Every file is split into pieces of about `chunksize` rows, and
+    up to `workers` processes (default DEFAULT_WORKERS) parse and enrich
+    the pieces while this process, the only SQLite writer, inserts them in
+    file order. At most workers + 1 pieces are in flight, so peak memory
+    across all processes is bounded by the chunk size and worker count
+    rather than the file sizes. Pass
+    chunksize=None to parse each file as a single piece. The source_file
+    column records which file each row came from.
+
+    Columns are read with the compact CSV_DTYPES schema; the cardholder
+    name and street columns are dropped unless keep_pii=True.
+
+    When db_path is a file it doubles as a cache: each source file's size,
+    mtime and SHA-256 plus DERIVATION_VERSION are stored alongside the
+    table, and a later call with the same, unchanged CSVs reopens the file
+    without parsing anything. Pass use_cache=False to force a rebuild. A
+    database that append_data added rows to is never rebuilt from inputs
+    that leave out any file it ingested unless use_cache=False; ValueError
+    is raised instead. Every input must exist before the database is touched. A
+    rebuild deletes the file only if load_data created it; in any other
+    SQLite database just the loader's own tables are replaced, under the
+    journaled APPEND_PRAGMAS so a failed load cannot corrupt it.
+
+    The INDEXES for the analytical queries are built after the bulk load
+    unless indexes=False, and the per-key rate counters used by
+    fraud_aggregates are accumulated from the same chunks.
+
+    With parquet_dir the enriched chunks are also written there as a
+    Parquet dataset partitioned by month (requires pyarrow), which
+    read_parquet_cache and ColumnStore.from_parquet read a few columns at
+    a time. A cached database is only reused if that dataset is current.
+    parquet_dir must be new, empty or an earlier such dataset; any other
+    directory raises ValueError.
+    """
+    filepaths = expand_sources(filepath)
+    missing = [path for path in filepaths if not os.path.isfile(path)]
+    if missing:
+        raise FileNotFoundError(f"No such CSV: {missing[0]}")
+    persistent = db_path != ":memory:"
+    if parquet_dir is not None:
+        # Fail before deleting or parsing anything
+        _pyarrow()
+        _parquet_cache_entries(parquet_dir)
+    if persistent and os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        with stage("load:cache_check"):
+            meta = _read_meta(conn)
+            fresh = use_cache and _cache_is_fresh(meta, filepaths, keep_pii) and (
+                parquet_dir is None or _parquet_is_current(parquet_dir, meta.get("db_uid")))
+        if fresh:
+            rows = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            print(f"[+] Reusing cached database {db_path} ({rows:,} rows)")
+            return conn
+        # After an append the database is more than a cache of the inputs:
+        # rebuild it only from inputs that include every file it ingested
+        inputs = {os.path.abspath(path) for path in filepaths}
+        lost = [path for path in meta.get("ingested", {}) if path not in inputs] \
+            if _appended_files(meta) else []
+        if lost and use_cache:
+            conn.close()
+            raise ValueError(f"{db_path} holds appended rows, and rebuilding it would drop those from "
+                             f"{', '.join(lost)}; add them to the inputs or pass use_cache=False (--no-cache)")
+        # Databases from before "owns_file" was recorded were always new files
+        owns_file = meta.get("owns_file", "derivation_version" in meta)
+        if owns_file:
+            # Created by load_data: start from an empty file rather than
+            # dropping tables row by row
+            conn.close()
+            os.remove(db_path)
+        else:
+            # Someone else's database: keep it and replace only our tables
+            drop_loader_tables(conn)
+            conn.close()
+
+    if parquet_dir is not None:
+        _clear_parquet_cache(parquet_dir)
+
+    owns_file = persistent and not os.path.exists(db_path)
+    tasks = []
+    for path in filepaths:
+        names, pieces = _csv_pieces(path, chunksize)
+        tasks.extend((path, names, start, end, keep_pii) for start, end in pieces)
+    workers = max(min(workers or DEFAULT_WORKERS, len(tasks)), 1)
+    print(f"Loading data from {', '.join(filepaths)}"
+          + (f" ({len(tasks)} pieces, {workers} workers)" if workers > 1 else "") + "...")
     conn = sqlite3.connect(db_path)
-    df.to_sql("transactions", conn, if_exists="replace", index=False)
-    print(f"[+] Loaded {len(df):,} rows into SQLite")
+
+    counts = []
+    file_rows = dict.fromkeys(filepaths, 0)
+    # Unjournaled writes are only safe in a file we can throw away
+    pragmas = APPEND_PRAGMAS if persistent and not owns_file else LOAD_PRAGMAS
+    with BulkLoader(conn, pragmas=pragmas) as loader:
+        for part, (chunk, chunk_counts, records) in enumerate(_enriched_pieces(tasks, workers)):
+            for name, record in records.items():
+                RUN_REPORT.add(name, record)
+            with stage("load:sqlite_insert", rows=len(chunk)):
+                loader.append(chunk)
+            if parquet_dir is not None:
+                with stage("load:parquet_write", rows=len(chunk)):
+                    write_parquet_chunk(chunk, parquet_dir, f"{part:05d}")
+            counts.append(chunk_counts)
+            file_rows[tasks[part][0]] += len(chunk)
+            if chunksize is not None:
+                print(f"    ... {loader.rows:,} rows loaded")
+    total_rows = loader.rows
+    with stage("load:rate_counters"):
+        save_rate_counters(conn, _sum_counts(counts), total_rows)
+    if indexes:
+        with stage("load:build_indexes", rows=total_rows):
+            build_indexes(conn)
+            ensure_trans_num_index(conn)
+
+    db_uid = uuid.uuid4().hex
+    _write_meta(conn, {"db_uid": db_uid, "data_version": 1})
+    if parquet_dir is not None:
+        with open(os.path.join(parquet_dir, PARQUET_META_FILE), "w") as fh:
+            json.dump({"db_uid": db_uid, "derivation_version": DERIVATION_VERSION, "rows": total_rows}, fh)
+        _write_meta(conn, {"parquet_dir": os.path.abspath(parquet_dir)})
+    if persistent:
+        sources = {os.path.abspath(path): source_fingerprint(path) for path in filepaths}
+        _write_meta(conn, {
+            "sources": sources,
+            "ingested": {path: dict(source, rows=file_rows[name])
+                         for (path, source), name in zip(sources.items(), filepaths)},
+            "derivation_version": DERIVATION_VERSION,
+            "keep_pii": keep_pii,
+            "owns_file": owns_file,
+        })
+    print(f"[+] Loaded {total_rows:,} rows into SQLite")
     return conn
 
 
+def drop_loader_tables(conn: sqlite3.Connection) -> None:
+    """Drop the tables and view that load_data creates, leaving any others in the database."""
+    conn.execute(f"DROP VIEW IF EXISTS {NAMED_VIEW}")
+    for table in ["transactions", CARDS_TABLE, *(f"dim_{column}" for column in DIMENSIONS),
+                  "_rate_counters", SCORECARD_TABLE, "_load_meta"]:
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    conn.commit()
+
+
+def ensure_trans_num_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create TRANS_NUM_INDEX if it is missing. Returns True if it is unique;
+    a table that already holds duplicate trans_num values gets a plain
+    index, which still serves append_data's duplicate lookups.
+    """
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?",
+                       (TRANS_NUM_INDEX,)).fetchone()
+    if row is None:
+        try:
+            conn.execute(f"CREATE UNIQUE INDEX {TRANS_NUM_INDEX} ON transactions (trans_num)")
+        except sqlite3.IntegrityError:
+            print("[!] transactions holds duplicate trans_num values; indexing them without UNIQUE")
+            conn.execute(f"CREATE INDEX {TRANS_NUM_INDEX} ON transactions (trans_num)")
+        conn.commit()
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (TRANS_NUM_INDEX,)).fetchone()
+    return row[0].upper().startswith("CREATE UNIQUE")
+
+
+def _appended_offset(filepath: str, previous: dict) -> int:
+    """
+    Byte offset where rows added to filepath since it was last ingested
+    begin: the previous size if the file still starts with the previously
+    ingested bytes, otherwise 0 (it was rewritten).
+    """
+    if os.path.getsize(filepath) < previous["size"]:
+        return 0
+    digest = hashlib.sha256()
+    remaining = previous["size"]
+    with open(filepath, "rb") as fh:
+        while remaining:
+            block = fh.read(min(1 << 20, remaining))
+            if not block:
+                return 0
+            digest.update(block)
+            remaining -= len(block)
+    return previous["size"] if digest.hexdigest() == previous["sha256"] else 0
+
+
+def _appended_files(meta: dict) -> list:
+    """Files whose rows append_data added after load_data built the database."""
+    sources = meta.get("sources", {})
+    return [path for path, entry in meta.get("ingested", {}).items()
+            if sources.get(path, {}).get("sha256") != entry.get("sha256")]
+
+
+def append_data(conn: sqlite3.Connection, filepath: str, chunksize: Optional[int] = DEFAULT_CHUNKSIZE) -> int:
+    """
+    Add the transactions in filepath that the database does not hold yet.
+
+    Files whose content was already ingested are skipped without parsing;
+    a previously ingested file that has grown is read from where it ended.
+    Each chunk is first checked against TRANS_NUM_INDEX, so derive_columns
+    only runs on rows whose trans_num is new, and those are inserted with
+    INSERT OR IGNORE under the journaled APPEND_PRAGMAS. The data version
+    is bumped, the Parquet cache (if any) extended, and the rate counters
+    and scorecard pick the rows up on their next refresh. Returns the
+    number of rows added.
+    """
+    path = os.path.abspath(filepath)
+    meta = _read_meta(conn)
+    ingested = meta.get("ingested", {})
+    source = source_fingerprint(filepath)
+    if any(entry["sha256"] == source["sha256"] for entry in ingested.values()):
+        print(f"[=] {filepath} was already ingested")
+        return 0
+    offset = _appended_offset(filepath, ingested[path]) if path in ingested else 0
+
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({NAMED_VIEW})")]
+    keep_pii = set(PII_COLUMNS) <= set(columns)
+    ensure_trans_num_index(conn)
+    parquet_dir = meta.get("parquet_dir")
+    if parquet_dir and not _parquet_is_current(parquet_dir, meta.get("db_uid")):
+        parquet_dir = None
+
+    print(f"Appending new rows from {filepath}" + (f" (from byte {offset:,})" if offset else "") + "...")
+    header = pd.read_csv(filepath, nrows=0).columns.tolist()
+    with open(filepath, "rb") as fh:
+        if offset:
+            fh.seek(offset)
+        with stage("append:csv_parse"):
+            reader = pd.read_csv(fh, chunksize=chunksize, header=None if offset else "infer",
+                                 names=header if offset else None, **_read_csv_kwargs(keep_pii))
+        if chunksize is None:
+            reader = [reader]
+
+        read = 0
+        with BulkLoader(conn, replace=False, pragmas=APPEND_PRAGMAS) as loader:
+            # Created after the PRAGMAs: changing temp_store drops temp tables
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS _incoming (trans_num TEXT PRIMARY KEY)")
+            for chunk in staged_chunks(reader, "append:csv_parse"):
+                read += len(chunk)
+                with stage("append:dedup", rows=len(chunk)):
+                    chunk.columns = chunk.columns.str.strip().str.lower()
+                    chunk = chunk.drop_duplicates("trans_num")
+                    conn.execute("DELETE FROM _incoming")
+                    conn.executemany("INSERT INTO _incoming VALUES (?)", zip(chunk["trans_num"].tolist()))
+                    stored = [row[0] for row in conn.execute(
+                        "SELECT trans_num FROM _incoming JOIN transactions USING (trans_num)")]
+                    chunk = chunk[~chunk["trans_num"].isin(stored)]
+                if chunk.empty:
+                    continue
+                with stage("append:derive_columns", rows=len(chunk)):
+                    derive_columns(chunk)
+                    _widen_floats(chunk)
+                    chunk["source_file"] = filepath
+                with stage("append:sqlite_insert", rows=len(chunk)):
+                    loader.append(chunk)
+                if parquet_dir:
+                    with stage("append:parquet_write", rows=len(chunk)):
+                        write_parquet_chunk(chunk, parquet_dir, f"append-{uuid.uuid4().hex[:12]}")
+            conn.execute("DROP TABLE temp._incoming")
+
+    added = loader.rows
+    ingested[path] = dict(source, rows=ingested.get(path, {}).get("rows", 0) + added)
+    _write_meta(conn, {"ingested": ingested})
+    if added:
+        bump_data_version(conn)
+        if parquet_dir:
+            with open(os.path.join(parquet_dir, PARQUET_META_FILE)) as fh:
+                parquet_meta = json.load(fh)
+            parquet_meta["rows"] += added
+            with open(os.path.join(parquet_dir, PARQUET_META_FILE), "w") as fh:
+                json.dump(parquet_meta, fh)
+    print(f"[+] Appended {added:,} new rows ({read - added:,} duplicates skipped)")
+    return added
+
+
 # ──────────────────────────────────────────────────────────
 # 2. CORE FRAUD QUERIES
 # ──────────────────────────────────────────────────────────
 
-def run_query(conn: sqlite3.Connection, sql: str) -> pd.DataFrame:
-    """Execute a SQL query and return a DataFrame."""
-    return pd.read_sql(sql, conn)
+class QueryCache:
+    """
+    LRU cache of run_query results.
+
+    Entries are keyed by the normalized SQL text, its parameters and the
+    database's data_version, so a load or append makes earlier results
+    unreachable instead of stale. The memory tier keeps at most
+    `max_bytes` of DataFrames (deep memory usage), evicting the least
+    recently used. With `disk_dir`, results are also written there as
+    Parquet or Feather files (requires pyarrow) and read back after they
+    leave memory, including by later processes. A disk file that cannot
+    be written or read is reported and skipped; the query still succeeds.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, disk_dir: Optional[str] = None,
+                 disk_format: str = "parquet"):
+        if disk_format not in ("parquet", "feather"):
+            raise ValueError(f"Unknown disk_format {disk_format!r}; expected 'parquet' or 'feather'")
+        if disk_dir is not None:
+            _pyarrow("The query cache's disk tier")
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_format = disk_format
+        self.enabled = True
+        self._entries = OrderedDict()  # key -> (DataFrame, bytes), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.{self.disk_format}")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """The cached result for key, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0].copy()
+        if self.disk_dir and os.path.exists(self._path(key)):
+            read = pd.read_parquet if self.disk_format == "parquet" else pd.read_feather
+            try:
+                result = read(self._path(key))
+            except Exception as exc:
+                print(f"[!] Query cache could not read {self._path(key)}: {exc!r}")
+            else:
+                self._remember(key, result)
+                with self._lock:
+                    self.disk_hits += 1
+                return result.copy()
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: pd.DataFrame) -> None:
+        self._remember(key, result)
+        if self.disk_dir:
+            # Write under a temporary name so other processes never read a partial file
+            tmp = f"{self._path(key)}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                if self.disk_format == "parquet":
+                    result.to_parquet(tmp, index=False)
+                else:
+                    result.reset_index(drop=True).to_feather(tmp)
+                os.replace(tmp, self._path(key))
+            except Exception as exc:
+                print(f"[!] Query cache could not write {self._path(key)}: {exc!r}")
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    def _remember(self, key: str, result: pd.DataFrame) -> None:
+        size = int(result.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, freed) = self._entries.popitem(last=False)
+                self._bytes -= freed
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters and the memory tier's current size."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop the memory tier (and with disk=True the cached files) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+        if disk and self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(f".{self.disk_format}"):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    @contextmanager
+    def disabled(self):
+        """Execute every query inside the block (e.g. while timing them)."""
+        previous, self.enabled = self.enabled, False
+        try:
+            yield
+        finally:
+            self.enabled = previous
+
+
+QUERY_CACHE = QueryCache()
+
+# A quoted literal (kept verbatim) or a run of whitespace (collapsed)
+_SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL with whitespace outside quoted literals collapsed and any trailing ';' removed."""
+    return _SQL_TOKENS.sub(lambda m: m.group(1) or " ", sql).strip().rstrip(";").rstrip()
+
+
+def data_version(conn: sqlite3.Connection) -> tuple:
+    """
+    (db uid, version counter, max rowid) identifying what the database
+    holds. The counter is bumped by every load and append; the max rowid
+    also catches rows inserted behind bump_data_version's back. The uid is
+    None for a database load_data did not build.
+    """
+    meta = _read_meta(conn)
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+    return _database_uid(conn), meta.get("data_version", 0), max_rowid
+
+
+def bump_data_version(conn: sqlite3.Connection) -> int:
+    """Record a change to the transactions table; returns the new version."""
+    version = _read_meta(conn).get("data_version", 0) + 1
+    _write_meta(conn, {"data_version": version})
+    return version
+
+
+def run_query(conn: sqlite3.Connection, sql: str, params: Optional[tuple] = None,
+              cache: bool = True) -> pd.DataFrame:
+    """
+    Execute a SQL query and return a DataFrame.
+
+    Results come from QUERY_CACHE when the same statement and params
+    already ran against the same data_version; cache=False, or a database
+    without a load uid, always executes.
+    """
+    if not (cache and QUERY_CACHE.enabled):
+        return pd.read_sql(sql, conn, params=params)
+    version = data_version(conn)
+    if version[0] is None:
+        return pd.read_sql(sql, conn, params=params)
+    key = hashlib.sha256(json.dumps(
+        [normalize_sql(sql), params, *version], default=str).encode()).hexdigest()
+    result = QUERY_CACHE.get(key)
+    if result is None:
+        result = pd.read_sql(sql, conn, params=params)
+        QUERY_CACHE.put(key, result)
+        result = result.copy()
+    return result
+
+
+def _use_numpy(backend: str) -> bool:
+    """Validate a query backend name ("sqlite" or "numpy")."""
+    if backend not in ("sqlite", "numpy"):
+        raise ValueError(f"Unknown backend {backend!r}; expected 'sqlite' or 'numpy'")
+    return backend == "numpy"
 
 
 def fraud_overview(conn: sqlite3.Connection) -> None:
@@ -105,23 +1165,41 @@ def fraud_overview(conn: sqlite3.Connection) -> None:
     print("=" * 50)
 
 
-def fraud_by_category(conn: sqlite3.Connection) -> pd.DataFrame:
+# Per-card transaction and fraud counts (one idx_card_time scan). Queries
+# on CARD_COLUMNS aggregate these ~1000 rows joined to the cards table
+# instead of joining every transaction.
+CARD_TOTALS = """(
+            SELECT cc_num, COUNT(*) AS total_txns, SUM(is_fraud) AS fraud_txns
+            FROM transactions
+            GROUP BY cc_num
+        )"""
+
+
+def fraud_by_category(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by merchant category."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_category")
     return run_query(conn, """
-        SELECT
-            category,
-            COUNT(*) AS total_txns,
-            SUM(is_fraud) AS fraud_txns,
-            ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct,
-            ROUND(AVG(CASE WHEN is_fraud = 1 THEN amt END), 2) AS avg_fraud_amt
-        FROM transactions
-        GROUP BY category
-        ORDER BY fraud_rate_pct DESC
+        SELECT category, total_txns, fraud_txns, fraud_rate_pct, avg_fraud_amt
+        FROM (
+            SELECT
+                category_id,
+                COUNT(*) AS total_txns,
+                SUM(is_fraud) AS fraud_txns,
+                ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct,
+                ROUND(AVG(CASE WHEN is_fraud = 1 THEN amt END), 2) AS avg_fraud_amt
+            FROM transactions
+            GROUP BY category_id
+        )
+        LEFT JOIN dim_category USING (category_id)
+        ORDER BY fraud_rate_pct DESC, category
     """)
 
 
-def fraud_by_hour(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_by_hour(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by hour of day."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_hour")
     return run_query(conn, """
         SELECT
             txn_hour,
@@ -134,8 +1212,10 @@ def fraud_by_hour(conn: sqlite3.Connection) -> pd.DataFrame:
     """)
 
 
-def fraud_by_day_of_week(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_by_day_of_week(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by day of week."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_day_of_week")
     return run_query(conn, """
         SELECT
             txn_day_of_week,
@@ -148,8 +1228,10 @@ def fraud_by_day_of_week(conn: sqlite3.Connection) -> pd.DataFrame:
     """)
 
 
-def fraud_by_amount_bucket(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_by_amount_bucket(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by transaction amount bucket."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_amount_bucket")
     return run_query(conn, """
         SELECT
             amount_bucket,
@@ -158,40 +1240,53 @@ def fraud_by_amount_bucket(conn: sqlite3.Connection) -> pd.DataFrame:
             ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct
         FROM transactions
         GROUP BY amount_bucket
-        ORDER BY fraud_rate_pct DESC
+        ORDER BY fraud_rate_pct DESC, amount_bucket
     """)
 
 
-def fraud_by_state(conn: sqlite3.Connection, n: int = 15) -> pd.DataFrame:
+def fraud_by_state(conn: sqlite3.Connection, n: int = 15, backend: str = "sqlite") -> pd.DataFrame:
     """Top N states by fraud count."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_state", limit=n)
     return run_query(conn, f"""
-        SELECT
-            state,
-            COUNT(*) AS total_txns,
-            SUM(is_fraud) AS fraud_txns,
-            ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct
-        FROM transactions
-        GROUP BY state
-        ORDER BY fraud_txns DESC
+        SELECT state, total_txns, fraud_txns, fraud_rate_pct
+        FROM (
+            SELECT
+                state_id,
+                SUM(total_txns) AS total_txns,
+                SUM(fraud_txns) AS fraud_txns,
+                ROUND(100.0 * SUM(fraud_txns) / SUM(total_txns), 2) AS fraud_rate_pct
+            FROM {CARD_TOTALS}
+            LEFT JOIN {CARDS_TABLE} USING (cc_num)
+            GROUP BY state_id
+        )
+        LEFT JOIN dim_state USING (state_id)
+        ORDER BY fraud_txns DESC, state
         LIMIT {n}
     """)
 
 
-def fraud_by_gender(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_by_gender(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by gender."""
-    return run_query(conn, """
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_gender")
+    return run_query(conn, f"""
         SELECT
             gender,
-            COUNT(*) AS total_txns,
-            SUM(is_fraud) AS fraud_txns,
-            ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct
-        FROM transactions
+            SUM(total_txns) AS total_txns,
+            SUM(fraud_txns) AS fraud_txns,
+            ROUND(100.0 * SUM(fraud_txns) / SUM(total_txns), 2) AS fraud_rate_pct
+        FROM {CARD_TOTALS}
+        LEFT JOIN {CARDS_TABLE} USING (cc_num)
         GROUP BY gender
+        ORDER BY gender
     """)
 
 
-def fraud_by_age_group(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_by_age_group(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by age group."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_age_group")
     return run_query(conn, """
         SELECT
             age_group,
@@ -201,22 +1296,25 @@ def fraud_by_age_group(conn: sqlite3.Connection) -> pd.DataFrame:
         FROM transactions
         WHERE age_group IS NOT NULL
         GROUP BY age_group
-        ORDER BY fraud_rate_pct DESC
+        ORDER BY fraud_rate_pct DESC, age_group
     """)
 
 
-def fraud_by_city_size(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_by_city_size(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Fraud rate by city population size."""
-    return run_query(conn, """
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_by_city_size")
+    return run_query(conn, f"""
         SELECT
             city_size,
-            COUNT(*) AS total_txns,
-            SUM(is_fraud) AS fraud_txns,
-            ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct
-        FROM transactions
+            SUM(total_txns) AS total_txns,
+            SUM(fraud_txns) AS fraud_txns,
+            ROUND(100.0 * SUM(fraud_txns) / SUM(total_txns), 2) AS fraud_rate_pct
+        FROM {CARD_TOTALS}
+        LEFT JOIN {CARDS_TABLE} USING (cc_num)
         WHERE city_size IS NOT NULL
         GROUP BY city_size
-        ORDER BY fraud_rate_pct DESC
+        ORDER BY fraud_rate_pct DESC, city_size
     """)
 
 
@@ -227,13 +1325,13 @@ def repeat_fraud_cards(conn: sqlite3.Connection) -> pd.DataFrame:
             cc_num,
             COUNT(*) AS fraud_count,
             ROUND(SUM(amt), 2) AS total_fraud_amount,
-            MIN(trans_date_trans_time) AS first_fraud,
-            MAX(trans_date_trans_time) AS last_fraud
+            datetime(MIN(trans_date_trans_time), 'unixepoch') AS first_fraud,
+            datetime(MAX(trans_date_trans_time), 'unixepoch') AS last_fraud
         FROM transactions
         WHERE is_fraud = 1
         GROUP BY cc_num
         HAVING COUNT(*) >= 3
-        ORDER BY fraud_count DESC
+        ORDER BY fraud_count DESC, cc_num
         LIMIT 20
     """)
 
@@ -241,23 +1339,30 @@ def repeat_fraud_cards(conn: sqlite3.Connection) -> pd.DataFrame:
 def high_risk_merchants(conn: sqlite3.Connection) -> pd.DataFrame:
     """Merchants with abnormally high fraud rates."""
     return run_query(conn, """
-        SELECT
-            merchant,
-            category,
-            COUNT(*) AS total_txns,
-            SUM(is_fraud) AS fraud_txns,
-            ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct,
-            ROUND(SUM(CASE WHEN is_fraud = 1 THEN amt ELSE 0 END), 2) AS total_fraud_amount
-        FROM transactions
-        GROUP BY merchant, category
-        HAVING COUNT(*) >= 20 AND SUM(is_fraud) >= 3
-        ORDER BY fraud_rate_pct DESC
+        SELECT merchant, category, total_txns, fraud_txns, fraud_rate_pct, total_fraud_amount
+        FROM (
+            SELECT
+                merchant_id,
+                category_id,
+                COUNT(*) AS total_txns,
+                SUM(is_fraud) AS fraud_txns,
+                ROUND(100.0 * SUM(is_fraud) / COUNT(*), 2) AS fraud_rate_pct,
+                ROUND(SUM(CASE WHEN is_fraud = 1 THEN amt ELSE 0 END), 2) AS total_fraud_amount
+            FROM transactions
+            GROUP BY merchant_id, category_id
+            HAVING COUNT(*) >= 20 AND SUM(is_fraud) >= 3
+        )
+        LEFT JOIN dim_merchant USING (merchant_id)
+        LEFT JOIN dim_category USING (category_id)
+        ORDER BY fraud_rate_pct DESC, merchant
         LIMIT 20
     """)
 
 
-def fraud_trend_monthly(conn: sqlite3.Connection) -> pd.DataFrame:
+def fraud_trend_monthly(conn: sqlite3.Connection, backend: str = "sqlite") -> pd.DataFrame:
     """Monthly fraud rate trend."""
+    if _use_numpy(backend):
+        return numpy_rate_query(conn, "fraud_trend_monthly")
     return run_query(conn, """
         SELECT
             txn_month,
@@ -270,12 +1375,700 @@ def fraud_trend_monthly(conn: sqlite3.Connection) -> pd.DataFrame:
     """)
 
 
+# The grouped rate queries above as data: the key column, the column they
+# ORDER BY (descending, with the key as tie-breaker; None orders by key),
+# whether NULL keys are filtered out, their LIMIT and whether they report
+# avg_fraud_amt. Used by the single-scan engine to rebuild their results.
+RATE_QUERIES = {
+    "fraud_by_category": {"key": "category", "order": "fraud_rate_pct", "avg_fraud_amt": True},
+    "fraud_by_hour": {"key": "txn_hour", "order": None},
+    "fraud_by_day_of_week": {"key": "txn_day_of_week", "order": None},
+    "fraud_by_amount_bucket": {"key": "amount_bucket", "order": "fraud_rate_pct"},
+    "fraud_by_state": {"key": "state", "order": "fraud_txns", "limit": 15},
+    "fraud_by_gender": {"key": "gender", "order": None},
+    "fraud_by_age_group": {"key": "age_group", "order": "fraud_rate_pct", "dropna": True},
+    "fraud_by_city_size": {"key": "city_size", "order": "fraud_rate_pct", "dropna": True},
+    "fraud_trend_monthly": {"key": "txn_month", "order": None},
+}
+
+
+def _sql_round(values: pd.Series, digits: int = 2) -> pd.Series:
+    """
+    Round non-negative values like SQLite's ROUND, half away from zero
+    (pandas' round goes half to even, so 0.125 would become 0.12, not 0.13).
+    """
+    scale = 10.0 ** digits
+    return np.floor(values * scale + 0.5) / scale
+
+
+def _rate_frame(stats: pd.DataFrame, spec: dict, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Shape additive per-key counters like the SQL for one RATE_QUERIES entry.
+
+    `stats` is indexed by key value and holds total_txns, fraud_txns and
+    fraud_amt (the sum of amt over fraud rows).
+    """
+    key = spec["key"]
+    if spec.get("dropna"):
+        stats = stats[stats.index.notna()]
+    df = stats.rename_axis(key).reset_index()
+    df["total_txns"] = df["total_txns"].astype("int64")
+    df["fraud_txns"] = df["fraud_txns"].astype("int64")
+    df["fraud_rate_pct"] = _sql_round(100.0 * df["fraud_txns"] / df["total_txns"])
+    columns = [key, "total_txns", "fraud_txns", "fraud_rate_pct"]
+    if spec.get("avg_fraud_amt"):
+        df["avg_fraud_amt"] = _sql_round(df["fraud_amt"] / df["fraud_txns"].where(df["fraud_txns"] > 0))
+        columns.append("avg_fraud_amt")
+
+    # SQLite sorts NULL keys first
+    df = df.sort_values(key, na_position="first", kind="stable")
+    if spec["order"] is not None:
+        df = df.sort_values(spec["order"], ascending=False, kind="stable")
+    limit = spec.get("limit") if limit is None else limit
+    if limit is not None:
+        df = df.head(limit)
+    return df[columns].reset_index(drop=True)
+
+
+RATE_KEYS = list(dict.fromkeys(spec["key"] for spec in RATE_QUERIES.values()))
+
+
+def count_by_keys(df: pd.DataFrame) -> dict:
+    """
+    Additive counters for every RATE_KEYS column present in a frame.
+
+    Returns {key: DataFrame indexed by key value with total_txns, fraud_txns
+    and fraud_amt}. Counters from different frames can be summed, which is
+    what lets the rate queries be answered from a single pass.
+    """
+    df = df.assign(fraud_amt=df["amt"].where(df["is_fraud"] == 1, 0.0))
+    return {
+        key: df.groupby(key, dropna=False, observed=True, sort=False).agg(
+            total_txns=("is_fraud", "size"),
+            fraud_txns=("is_fraud", "sum"),
+            fraud_amt=("fraud_amt", "sum"),
+        )
+        for key in RATE_KEYS if key in df.columns
+    }
+
+
+def _sum_counts(parts: list) -> dict:
+    """Add up a list of count_by_keys results."""
+    keys = dict.fromkeys(key for part in parts for key in part)
+    return {
+        key: pd.concat([part[key] for part in parts if key in part]).groupby(level=0, dropna=False).sum()
+        for key in keys
+    }
+
+
+def save_rate_counters(conn: sqlite3.Connection, counts: dict, upto_rowid: int) -> None:
+    """Store counters covering every transactions row up to `upto_rowid`."""
+    conn.execute("DROP TABLE IF EXISTS _rate_counters")
+    conn.execute("""
+        CREATE TABLE _rate_counters (
+            key_column TEXT, key_value, total_txns INTEGER, fraud_txns INTEGER, fraud_amt REAL
+        )
+    """)
+    rows = [
+        (key, None if pd.isna(value) else value, int(total), int(fraud), float(amount))
+        for key, stats in counts.items()
+        for value, total, fraud, amount in zip(
+            stats.index.astype(object), stats["total_txns"], stats["fraud_txns"], stats["fraud_amt"]
+        )
+    ]
+    conn.executemany("INSERT INTO _rate_counters VALUES (?, ?, ?, ?, ?)", rows)
+    _write_meta(conn, {"rate_counters_rowid": upto_rowid})
+
+
+def refresh_rate_counters(conn: sqlite3.Connection, chunksize: int = DEFAULT_CHUNKSIZE) -> None:
+    """
+    Bring the stored rate counters up to date with the transactions table.
+
+    Only rows added since the counters were last saved are scanned, in one
+    pass over all RATE_KEYS columns; a database without counters gets one
+    full scan.
+    """
+    covered = _read_meta(conn).get("rate_counters_rowid", 0)
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+    if max_rowid <= covered:
+        return
+
+    parts = [{key: frame.set_index(key) for key, frame in _stored_counters(conn).items()}] if covered else []
+    sql = f"SELECT {', '.join(RATE_KEYS)}, is_fraud, amt FROM {NAMED_VIEW} WHERE rowid > ? AND rowid <= ?"
+    for chunk in pd.read_sql(sql, conn, params=(covered, max_rowid), chunksize=chunksize):
+        parts.append(count_by_keys(chunk))
+    save_rate_counters(conn, _sum_counts(parts), max_rowid)
+
+
+def _stored_counters(conn: sqlite3.Connection) -> dict:
+    """Read the _rate_counters table back as {key: DataFrame with a `key` column}."""
+    # Not cached: refresh_rate_counters rewrites the table without a new data_version
+    return {
+        key: run_query(conn, f"""
+            SELECT key_value AS {key}, total_txns, fraud_txns, fraud_amt
+            FROM _rate_counters
+            WHERE key_column = '{key}'
+        """, cache=False)
+        for key in RATE_KEYS
+    }
+
+
+def fraud_aggregates(conn: sqlite3.Connection, queries: Optional[list] = None,
+                     n_states: int = 15) -> dict:
+    """
+    Answer the RATE_QUERIES from additive counters instead of one GROUP BY each.
+
+    The counters (COUNT, SUM(is_fraud) and the fraud SUM(amt) per key, for
+    every key at once) are collected by load_data while it streams the CSV
+    and stored in the database, and refresh_rate_counters scans only rows
+    appended since. Returns {query name: DataFrame} matching what the
+    individual fraud_by_* / fraud_trend_monthly functions return.
+    """
+    refresh_rate_counters(conn)
+    counters = _stored_counters(conn)
+    results = {}
+    for name in (list(RATE_QUERIES) if queries is None else queries):
+        spec = RATE_QUERIES[name]
+        stats = counters[spec["key"]].set_index(spec["key"])
+        limit = n_states if name == "fraud_by_state" else None
+        results[name] = _rate_frame(stats, spec, limit)
+    return results
+
+
+class ColumnStore:
+    """
+    Integer-coded in-memory copy of the RATE_KEYS columns.
+
+    Each key column is held as an array of codes into its list of distinct
+    values (None for NULL), next to is_fraud and the fraud amount, so a
+    grouped rate query is three np.bincount calls with no SQLite involved.
+    """
+
+    def __init__(self):
+        self.codes = {key: [] for key in RATE_KEYS}
+        self.values = {key: [] for key in RATE_KEYS}
+        self.dtypes = {}
+        self.is_fraud = np.empty(0, dtype=np.int8)
+        self.fraud_amt = np.empty(0, dtype=np.float64)
+        self.upto_rowid = 0
+        self._lookup = {key: {} for key in RATE_KEYS}
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection, chunksize: int = DEFAULT_CHUNKSIZE) -> "ColumnStore":
+        store = cls()
+        store.refresh(conn, chunksize)
+        return store
+
+    @classmethod
+    def from_parquet(cls, parquet_dir: str) -> "ColumnStore":
+        """
+        Build the store from load_data's Parquet cache, reading only the
+        RATE_KEYS, is_fraud and amt columns. The cache holds the rows of a
+        fresh load, i.e. rowids 1..n, so refresh() picks up later appends.
+        """
+        frame = read_parquet_cache(parquet_dir, RATE_KEYS + ["is_fraud", "amt"])
+        store = cls()
+        for key in RATE_KEYS:
+            column = frame[key]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype(column.cat.categories.dtype)
+            # Match the dtypes pd.read_sql gives the same column
+            kind = column.dtype.kind
+            store.dtypes[key] = np.dtype("int64") if kind in "iu" else np.dtype("float64") if kind == "f" \
+                else column.dtype
+            store.codes[key] = [store._encode(key, column)]
+        store.is_fraud = frame["is_fraud"].to_numpy(dtype=np.int8)
+        store.fraud_amt = frame["amt"].where(frame["is_fraud"] == 1, 0.0).to_numpy(dtype=np.float64)
+        store.upto_rowid = len(frame)
+        return store
+
+    def _encode(self, key: str, column: pd.Series) -> np.ndarray:
+        """Map a chunk's values to this store's codes, adding unseen values."""
+        local_codes, uniques = pd.factorize(column)
+        lookup, values = self._lookup[key], self.values[key]
+        mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+        for i, value in enumerate(list(uniques) + [None]):
+            if value not in lookup:
+                lookup[value] = len(values)
+                values.append(value)
+            mapping[i] = lookup[value]
+        # factorize marks NULLs with -1, which picks the trailing None slot
+        return mapping[local_codes]
+
+    def refresh(self, conn: sqlite3.Connection, chunksize: int = DEFAULT_CHUNKSIZE) -> None:
+        """Append transactions rows added since the store was last refreshed."""
+        max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+        if max_rowid <= self.upto_rowid:
+            return
+        sql = f"SELECT {', '.join(RATE_KEYS)}, is_fraud, amt FROM {NAMED_VIEW} WHERE rowid > ? AND rowid <= ?"
+        is_fraud, fraud_amt = [self.is_fraud], [self.fraud_amt]
+        for chunk in pd.read_sql(sql, conn, params=(self.upto_rowid, max_rowid), chunksize=chunksize):
+            for key in RATE_KEYS:
+                self.dtypes.setdefault(key, chunk[key].dtype)
+                self.codes[key].append(self._encode(key, chunk[key]))
+            is_fraud.append(chunk["is_fraud"].to_numpy(dtype=np.int8))
+            fraud_amt.append(chunk["amt"].where(chunk["is_fraud"] == 1, 0.0).to_numpy(dtype=np.float64))
+        self.is_fraud = np.concatenate(is_fraud)
+        self.fraud_amt = np.concatenate(fraud_amt)
+        self.codes = {key: [np.concatenate(parts)] for key, parts in self.codes.items()}
+        self.upto_rowid = max_rowid
+
+    def counts(self, key: str) -> pd.DataFrame:
+        """Per-value total_txns, fraud_txns and fraud_amt for one key column."""
+        codes = self.codes[key][0]
+        size = len(self.values[key])
+        total = np.bincount(codes, minlength=size)
+        seen = total > 0  # drops the None slot when a column has no NULLs
+        values = np.array(self.values[key], dtype=object)[seen]
+        return pd.DataFrame({
+            "total_txns": total[seen],
+            "fraud_txns": np.bincount(codes, weights=self.is_fraud, minlength=size)[seen],
+            "fraud_amt": np.bincount(codes, weights=self.fraud_amt, minlength=size)[seen],
+        }, index=pd.Index(values, dtype=self.dtypes[key]))
+
+
+# Column stores for the numpy backend, keyed by database uid (most recent last)
+_COLUMN_STORES = OrderedDict()
+_MAX_COLUMN_STORES = 2
+
+
+def _database_uid(conn: sqlite3.Connection) -> Optional[str]:
+    """Identifier that load_data gives each database it builds (None for any other database)."""
+    return _read_meta(conn).get("db_uid")
+
+
+def column_store(conn: sqlite3.Connection) -> ColumnStore:
+    """
+    The connection's ColumnStore, built on first use (from the Parquet
+    cache when load_data wrote one) and refreshed after appends.
+    """
+    uid = _database_uid(conn)
+    if uid is None:
+        # Nothing identifies the database across calls, so nothing can be reused
+        return ColumnStore.from_connection(conn)
+    store = _COLUMN_STORES.pop(uid, None)
+    parquet_dir = _read_meta(conn).get("parquet_dir") if store is None else None
+    if store is None and parquet_dir and _parquet_is_current(parquet_dir, uid):
+        store = ColumnStore.from_parquet(parquet_dir)
+    elif store is None:
+        store = ColumnStore.from_connection(conn)
+    store.refresh(conn)
+    _COLUMN_STORES[uid] = store
+    while len(_COLUMN_STORES) > _MAX_COLUMN_STORES:
+        _COLUMN_STORES.popitem(last=False)
+    return store
+
+
+def numpy_rate_query(conn: sqlite3.Connection, name: str, limit: Optional[int] = None) -> pd.DataFrame:
+    """Answer one RATE_QUERIES entry with np.bincount over the connection's ColumnStore."""
+    spec = RATE_QUERIES[name]
+    return _rate_frame(column_store(conn).counts(spec["key"]), spec, limit)
+
+
+def check_backend_parity(conn: sqlite3.Connection) -> None:
+    """Assert that the numpy backend returns exactly the sqlite backend's DataFrames."""
+    for name in RATE_QUERIES:
+        query_func = globals()[name]
+        pd.testing.assert_frame_equal(
+            query_func(conn, backend="numpy"), query_func(conn, backend="sqlite"), obj=name
+        )
+    print(f"[+] numpy backend matches sqlite for {len(RATE_QUERIES)} queries")
+
+
+# Materialized form of the fraud_risk_scorecard view (section 7 of
+# fraud_detection_queries.sql). Only additive counters are stored, so new
+# rows can be folded in without re-aggregating the table.
+SCORECARD_TABLE = "fraud_risk_scorecard_cube"
+
+
+def refresh_scorecard(conn: sqlite3.Connection) -> int:
+    """
+    Fold transactions rows added since the last refresh into the scorecard cube.
+
+    The first call aggregates the whole table; later calls only scan rowids
+    above the stored watermark and add their counts to existing cells.
+    Returns the number of transactions rows scanned.
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SCORECARD_TABLE} (
+            category    TEXT,
+            state       TEXT,
+            txn_hour    INTEGER,
+            value_tier  TEXT,
+            total_txns  INTEGER,
+            fraud_txns  INTEGER,
+            sum_amt     REAL,
+            PRIMARY KEY (category, state, txn_hour, value_tier)
+        )
+    """)
+    covered = _read_meta(conn).get("scorecard_rowid", 0)
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+    if max_rowid <= covered:
+        return 0
+
+    conn.execute(f"""
+        INSERT INTO {SCORECARD_TABLE}
+        SELECT category, state, txn_hour, value_tier, total_txns, fraud_txns, sum_amt
+        FROM (
+            SELECT
+                category_id,
+                {CARDS_TABLE}.state_id,
+                txn_hour,
+                CASE
+                    WHEN amt > 500 THEN 'High Value'
+                    WHEN amt > 100 THEN 'Medium Value'
+                    ELSE 'Low Value'
+                END AS value_tier,
+                COUNT(*) AS total_txns,
+                SUM(is_fraud) AS fraud_txns,
+                SUM(amt) AS sum_amt
+            FROM transactions
+            LEFT JOIN {CARDS_TABLE} USING (cc_num)
+            WHERE transactions.rowid > ? AND transactions.rowid <= ?
+            GROUP BY category_id, {CARDS_TABLE}.state_id, txn_hour, value_tier
+        )
+        LEFT JOIN dim_category USING (category_id)
+        LEFT JOIN dim_state USING (state_id)
+        WHERE true  -- keeps ON CONFLICT from parsing as a join constraint
+        ON CONFLICT (category, state, txn_hour, value_tier) DO UPDATE SET
+            total_txns = total_txns + excluded.total_txns,
+            fraud_txns = fraud_txns + excluded.fraud_txns,
+            sum_amt = sum_amt + excluded.sum_amt
+    """, (covered, max_rowid))
+    _write_meta(conn, {"scorecard_rowid": max_rowid})
+    return max_rowid - covered
+
+
+def high_risk_scorecard(conn: sqlite3.Connection, min_rate_pct: float = 5.0,
+                        min_txns: int = 10, n: int = 25) -> pd.DataFrame:
+    """
+    Highest-risk category x state x hour x value tier cells, from the cube.
+
+    Equivalent to `SELECT * FROM fraud_risk_scorecard WHERE fraud_rate_pct > 5
+    ORDER BY fraud_rate_pct DESC LIMIT 25`, but reads only the materialized
+    counters after bringing them up to date.
+    """
+    refresh_scorecard(conn)
+    return run_query(conn, f"""
+        SELECT
+            category,
+            state,
+            txn_hour,
+            value_tier,
+            total_txns,
+            fraud_txns,
+            ROUND(100.0 * fraud_txns / total_txns, 2) AS fraud_rate_pct,
+            ROUND(sum_amt / total_txns, 2) AS avg_txn_amount
+        FROM {SCORECARD_TABLE}
+        WHERE total_txns >= {min_txns}
+          AND ROUND(100.0 * fraud_txns / total_txns, 2) > {min_rate_pct}
+        ORDER BY fraud_rate_pct DESC, category, state, txn_hour, value_tier
+        LIMIT {n}
+    """)
+
+
 # ──────────────────────────────────────────────────────────
-# 3. VISUALIZATIONS
+# 3. PER-CARD DETECTORS
 # ──────────────────────────────────────────────────────────
 
-def plot_fraud_by_category(df_cat: pd.DataFrame) -> None:
+def _card_timeline(conn: sqlite3.Connection, columns: str = "") -> pd.DataFrame:
+    """
+    Every transaction's rowid, cc_num, epoch-second `ts` and `columns`,
+    sorted once by (cc_num, ts). Not cached: one row per transaction is
+    too large to keep in QUERY_CACHE or write to its disk tier.
+    """
+    df = run_query(conn, f"""
+        SELECT
+            rowid AS row_id,
+            cc_num,
+            trans_date_trans_time AS ts{columns}
+        FROM transactions
+    """, cache=False)
+    order = np.lexsort((df["ts"].to_numpy(), df["cc_num"].to_numpy()))
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _window_pairs(cards: np.ndarray, ts: np.ndarray, window_seconds: int) -> tuple:
+    """
+    Index pairs (i, j) with cards[i] == cards[j] and 0 < ts[j] - ts[i] <= window.
+
+    Inputs must be sorted by (card, ts). Cards are ranked and folded into a
+    single int64 key whose per-card stride exceeds the time span, so both
+    ends of every window come from one vectorized searchsorted (a two-pointer
+    sweep without the Python loop). Cost is O(n log n) plus the pair count.
+    """
+    if len(ts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    card_rank = np.concatenate([[0], np.cumsum(cards[1:] != cards[:-1])])
+    offset = ts - ts.min()
+    key = card_rank * (int(offset.max()) + window_seconds + 1) + offset
+
+    lo = np.searchsorted(key, key, side="right")  # first strictly later txn
+    hi = np.searchsorted(key, key + window_seconds, side="right")
+    counts = hi - lo
+    first = np.repeat(np.arange(len(key)), counts)
+    second = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    return first, second
+
+
+def rapid_successive_txns(conn: sqlite3.Connection, window_minutes: int = 10, n: int = 20) -> pd.DataFrame:
+    """
+    Same-card transaction pairs within `window_minutes`, at least one fraudulent.
+
+    Python counterpart of query 5b in fraud_detection_queries.sql, with the
+    same columns, ordered by minutes_apart. Instead of the per-card
+    self-join it sorts by (cc_num, time) once and sweeps each window, so it
+    runs in O(n log n) on the full table.
+    """
+    df = _card_timeline(conn, ", is_fraud")
+    first, second = _window_pairs(df["cc_num"].to_numpy(), df["ts"].to_numpy(), 60 * window_minutes)
+
+    is_fraud = df["is_fraud"].to_numpy()
+    keep = (is_fraud[first] == 1) | (is_fraud[second] == 1)
+    pairs = pd.DataFrame({
+        "cc_num": df["cc_num"].to_numpy()[first[keep]],
+        "row1": df["row_id"].to_numpy()[first[keep]],
+        "row2": df["row_id"].to_numpy()[second[keep]],
+        "minutes_apart": (df["ts"].to_numpy()[second[keep]] - df["ts"].to_numpy()[first[keep]]) / 60,
+    })
+    pairs = pairs.sort_values(["minutes_apart", "cc_num", "row1", "row2"], kind="stable").head(n)
+
+    # Fetch the display columns for the reported pairs only
+    row_ids = ", ".join(str(i) for i in set(pairs["row1"]) | set(pairs["row2"])) or "NULL"
+    details = run_query(conn, f"""
+        SELECT rowid AS row_id, trans_num, amt,
+               datetime(trans_date_trans_time, 'unixepoch') AS trans_date_trans_time
+        FROM transactions
+        WHERE rowid IN ({row_ids})
+    """).set_index("row_id")
+    one, two = details.loc[pairs["row1"]], details.loc[pairs["row2"]]
+    return pd.DataFrame({
+        "cc_num": pairs["cc_num"].to_numpy(),
+        "txn1_id": one["trans_num"].to_numpy(),
+        "txn2_id": two["trans_num"].to_numpy(),
+        "amt1": one["amt"].to_numpy(),
+        "amt2": two["amt"].to_numpy(),
+        "time1": one["trans_date_trans_time"].to_numpy(),
+        "time2": two["trans_date_trans_time"].to_numpy(),
+        "minutes_apart": pairs["minutes_apart"].to_numpy(),
+    })
+
+
+EARTH_RADIUS_MILES = 3959.0
+
+
+def haversine_miles(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distance in miles between coordinate arrays (degrees).
+
+    Uses the haversine form 2R*asin(sqrt(a)), which stays accurate for
+    nearby points where the spherical law of cosines in query 5c loses
+    precision to ACOS near 1.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def geo_velocity_anomalies(conn: sqlite3.Connection, window_minutes: int = 60,
+                           min_miles: float = 100.0, n: int = 20) -> pd.DataFrame:
+    """
+    Same-card transaction pairs far apart within `window_minutes` (card cloning).
+
+    Python counterpart of query 5c in fraud_detection_queries.sql, plus the
+    implied travel speed. Transactions are sorted by (cc_num, time) once and
+    each is compared only with later ones inside its window. Distance uses
+    the merchant coordinates: the cardholder lat/long that 5c reads are the
+    same on every row of a card, so they can never move. For the same
+    reason each transaction is reported by its merchant and merchant
+    coordinates rather than 5c's (home) city and state.
+    """
+    df = _card_timeline(conn, ", merch_lat, merch_long")
+    first, second = _window_pairs(df["cc_num"].to_numpy(), df["ts"].to_numpy(), 60 * window_minutes)
+
+    lat, lon = df["merch_lat"].to_numpy(), df["merch_long"].to_numpy()
+    distance = haversine_miles(lat[first], lon[first], lat[second], lon[second])
+    keep = distance > min_miles
+    ts = df["ts"].to_numpy()
+    pairs = pd.DataFrame({
+        "cc_num": df["cc_num"].to_numpy()[first[keep]],
+        "row1": df["row_id"].to_numpy()[first[keep]],
+        "row2": df["row_id"].to_numpy()[second[keep]],
+        "minutes_apart": (ts[second[keep]] - ts[first[keep]]) / 60,
+        "distance_miles": distance[keep],
+    })
+    pairs["speed_mph"] = pairs["distance_miles"] / (pairs["minutes_apart"] / 60)
+    pairs = pairs.sort_values(["distance_miles", "cc_num", "row1", "row2"],
+                              ascending=[False, True, True, True], kind="stable").head(n)
+
+    row_ids = ", ".join(str(i) for i in set(pairs["row1"]) | set(pairs["row2"])) or "NULL"
+    details = run_query(conn, f"""
+        SELECT rowid AS row_id, trans_num, merchant, merch_lat, merch_long
+        FROM {NAMED_VIEW}
+        WHERE rowid IN ({row_ids})
+    """).set_index("row_id")
+    one, two = details.loc[pairs["row1"]], details.loc[pairs["row2"]]
+    return pd.DataFrame({
+        "cc_num": pairs["cc_num"].to_numpy(),
+        "txn1": one["trans_num"].to_numpy(),
+        "txn2": two["trans_num"].to_numpy(),
+        "merchant1": one["merchant"].to_numpy(),
+        "merchant2": two["merchant"].to_numpy(),
+        "merch_lat1": one["merch_lat"].to_numpy(),
+        "merch_long1": one["merch_long"].to_numpy(),
+        "merch_lat2": two["merch_lat"].to_numpy(),
+        "merch_long2": two["merch_long"].to_numpy(),
+        "minutes_apart": pairs["minutes_apart"].to_numpy(),
+        "distance_miles": pairs["distance_miles"].round(1).to_numpy(),
+        "speed_mph": pairs["speed_mph"].round(1).to_numpy(),
+    })
+
+
+# ──────────────────────────────────────────────────────────
+# 4. INDEXES
+# ──────────────────────────────────────────────────────────
+
+# Built after the bulk load. The (column, is_fraud, ...) indexes cover every
+# column their GROUP BY query reads, so SQLite answers them with an
+# index-only scan of a much smaller b-tree and no temp sort. The partial
+# index holds only fraud rows for the WHERE is_fraud = 1 card queries.
+# Gender, state and city size live in the cards table; their queries scan
+# idx_card_time through CARD_TOTALS.
+INDEXES = {
+    "idx_card_time": "transactions(cc_num, trans_date_trans_time, is_fraud, amt)",
+    "idx_fraud_card": "transactions(cc_num, trans_date_trans_time, amt) WHERE is_fraud = 1",
+    "idx_merchant": "transactions(merchant_id, category_id, is_fraud, amt)",
+    "idx_category": "transactions(category_id, is_fraud, amt)",
+    "idx_hour": "transactions(txn_hour, is_fraud)",
+    "idx_day_of_week": "transactions(txn_day_of_week, is_fraud)",
+    "idx_month": "transactions(txn_month, is_fraud)",
+    "idx_amount_bucket": "transactions(amount_bucket, is_fraud)",
+    "idx_age_group": "transactions(age_group, is_fraud)",
+}
+
+# Query functions whose plans and timings are checked by index_report
+QUERY_SUITE = [
+    fraud_by_category,
+    fraud_by_hour,
+    fraud_by_day_of_week,
+    fraud_by_amount_bucket,
+    fraud_by_state,
+    fraud_by_gender,
+    fraud_by_age_group,
+    fraud_by_city_size,
+    repeat_fraud_cards,
+    high_risk_merchants,
+    fraud_trend_monthly,
+]
+
+
+def build_indexes(conn: sqlite3.Connection) -> float:
+    """Create the INDEXES that do not exist yet, refresh planner stats and return build seconds."""
+    start = time.perf_counter()
+    for name, target in INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    conn.execute("ANALYZE")
+    conn.commit()
+    seconds = time.perf_counter() - start
+    print(f"[+] Built {len(INDEXES)} indexes in {seconds:.1f}s")
+    return seconds
+
+
+def drop_indexes(conn: sqlite3.Connection) -> None:
+    """Drop the INDEXES (used to measure queries without them)."""
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+
+
+def _captured_sql(conn: sqlite3.Connection, query_func) -> list:
+    """Run a query function and return the SQL statements it executed."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        query_func(conn)
+    finally:
+        conn.set_trace_callback(None)
+    return statements
+
+
+def explain_query(conn: sqlite3.Connection, sql: str) -> str:
+    """EXPLAIN QUERY PLAN for a statement, one plan step per line."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def _timed(conn: sqlite3.Connection, query_func, repeat: int = 3) -> float:
+    """Best-of-`repeat` wall time of a query function in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query_func(conn)
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best
+
+
+def index_report(conn: sqlite3.Connection, benchmark: bool = False) -> pd.DataFrame:
+    """
+    Check that each query in QUERY_SUITE is planned onto one of the INDEXES.
+
+    Prints the index each query uses (from EXPLAIN QUERY PLAN). With
+    benchmark=True the indexes are dropped and rebuilt so each query is also
+    timed without and with them, and the total per-run saving is compared
+    against the index build time.
+    """
+    # Cached results would hide both the statements and their cost
+    with QUERY_CACHE.disabled():
+        if benchmark:
+            drop_indexes(conn)
+            before = {func.__name__: _timed(conn, func) for func in QUERY_SUITE}
+            build_seconds = build_indexes(conn)
+        else:
+            build_indexes(conn)
+
+        rows = []
+        for func in QUERY_SUITE:
+            plans = [explain_query(conn, sql) for sql in _captured_sql(conn, func)]
+            used = sorted({name for name in INDEXES for plan in plans if f"INDEX {name}" in plan})
+            row = {"query": func.__name__, "index_used": ", ".join(used) or "NONE (full scan)"}
+            if benchmark:
+                row["before_ms"] = round(before[func.__name__], 1)
+                row["after_ms"] = round(_timed(conn, func), 1)
+                row["speedup"] = round(row["before_ms"] / max(row["after_ms"], 1e-3), 1)
+            rows.append(row)
+    report = pd.DataFrame(rows)
+
+    print("\n--- Index Usage ---")
+    print(report.to_string(index=False))
+    if benchmark:
+        saved = (report["before_ms"].sum() - report["after_ms"].sum()) / 1000
+        print(f"  Index build: {build_seconds:.2f}s   Query time saved per run: {saved:.2f}s")
+    return report
+
+
+# ──────────────────────────────────────────────────────────
+# 5. VISUALIZATIONS
+# ──────────────────────────────────────────────────────────
+
+# matplotlib and seaborn take most of the module's import time, so they are
+# imported the first time a chart is drawn rather than at import.
+_PYPLOT = None
+
+
+def _pyplot():
+    """Return matplotlib.pyplot, importing it and applying the seaborn theme on first use."""
+    global _PYPLOT
+    if _PYPLOT is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        sns.set_theme(style="whitegrid")
+        _PYPLOT = plt
+    return _PYPLOT
+
+
+def plot_fraud_by_category(df_cat: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Bar chart of fraud rate by category."""
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 7))
     df_cat.sort_values("fraud_rate_pct").plot(
         x="category", y="fraud_rate_pct", kind="barh", ax=ax, color="crimson", legend=False
@@ -284,13 +2077,14 @@ def plot_fraud_by_category(df_cat: pd.DataFrame) -> None:
     ax.set_xlabel("Fraud Rate (%)")
     ax.set_ylabel("")
     plt.tight_layout()
-    plt.savefig("outputs/fraud_rate_by_category.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_rate_by_category.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_rate_by_category.png")
 
 
-def plot_fraud_by_hour(df_hour: pd.DataFrame) -> None:
+def plot_fraud_by_hour(df_hour: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Dual-axis: transaction volume bars + fraud rate line by hour."""
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 5))
     ax.bar(df_hour["txn_hour"], df_hour["total_txns"], alpha=0.3, color="steelblue", label="Total Txns")
     ax2 = ax.twinx()
@@ -302,13 +2096,14 @@ def plot_fraud_by_hour(df_hour: pd.DataFrame) -> None:
     ax.legend(loc="upper left")
     ax2.legend(loc="upper right")
     plt.tight_layout()
-    plt.savefig("outputs/fraud_rate_by_hour.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_rate_by_hour.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_rate_by_hour.png")
 
 
-def plot_fraud_by_day(df_dow: pd.DataFrame) -> None:
+def plot_fraud_by_day(df_dow: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Fraud rate by day of week."""
+    plt = _pyplot()
     day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     fig, ax = plt.subplots(figsize=(8, 5))
     bars = ax.bar(df_dow["txn_day_of_week"], df_dow["fraud_rate_pct"], color="teal")
@@ -318,13 +2113,14 @@ def plot_fraud_by_day(df_dow: pd.DataFrame) -> None:
     ax.set_ylabel("Fraud Rate (%)")
     ax.set_xlabel("Day of Week")
     plt.tight_layout()
-    plt.savefig("outputs/fraud_rate_by_day.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_rate_by_day.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_rate_by_day.png")
 
 
-def plot_fraud_by_amount(df_amt: pd.DataFrame) -> None:
+def plot_fraud_by_amount(df_amt: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Bar chart of fraud rate by amount bucket."""
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(8, 5))
     df_amt.plot(x="amount_bucket", y="fraud_rate_pct", kind="bar", ax=ax, color="darkorange", legend=False)
     ax.set_title("Fraud Rate by Transaction Amount", fontsize=14)
@@ -332,31 +2128,60 @@ def plot_fraud_by_amount(df_amt: pd.DataFrame) -> None:
     ax.set_xlabel("Amount Bucket ($)")
     plt.xticks(rotation=0)
     plt.tight_layout()
-    plt.savefig("outputs/fraud_rate_by_amount.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_rate_by_amount.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_rate_by_amount.png")
 
 
-def plot_amount_distribution(conn: sqlite3.Connection) -> None:
+def amount_histogram(conn: sqlite3.Connection, bins: int = 50,
+                     amount_range: tuple = (0, 1500)) -> pd.DataFrame:
+    """
+    Legitimate vs fraudulent transaction counts per equal-width amount bin.
+
+    Binning happens in SQLite, so only `bins` rows per class leave the
+    database. Bins follow np.histogram: half-open except the last, which
+    includes the upper edge; amounts outside `amount_range` are ignored.
+    """
+    lo, hi = amount_range
+    width = (hi - lo) / bins
+    counts = run_query(conn, f"""
+        SELECT
+            is_fraud,
+            MIN(CAST((amt - {lo}) / {width} AS INTEGER), {bins - 1}) AS bin,
+            COUNT(*) AS txns
+        FROM transactions
+        WHERE amt >= {lo} AND amt <= {hi}
+        GROUP BY is_fraud, bin
+    """)
+    edges = np.linspace(lo, hi, bins + 1)
+    hist = pd.DataFrame({"bin_left": edges[:-1], "bin_right": edges[1:]})
+    for label, flag in [("legitimate", 0), ("fraudulent", 1)]:
+        rows = counts[counts["is_fraud"] == flag]
+        hist[label] = np.bincount(rows["bin"], weights=rows["txns"], minlength=bins).astype("int64")
+    return hist
+
+
+def plot_amount_distribution(df_hist: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Histogram comparing legitimate vs fraudulent transaction amounts."""
-    legit = run_query(conn, "SELECT amt FROM transactions WHERE is_fraud = 0")
-    fraud = run_query(conn, "SELECT amt FROM transactions WHERE is_fraud = 1")
+    plt = _pyplot()
+    edges = np.append(df_hist["bin_left"].to_numpy(), df_hist["bin_right"].iloc[-1])
 
     fig, ax = plt.subplots(figsize=(10, 5))
-    ax.hist(legit["amt"], bins=50, alpha=0.5, label="Legitimate", color="steelblue", range=(0, 1500))
-    ax.hist(fraud["amt"], bins=50, alpha=0.7, label="Fraudulent", color="crimson", range=(0, 1500))
+    ax.stairs(df_hist["legitimate"], edges, fill=True, alpha=0.5, label="Legitimate", color="steelblue")
+    ax.stairs(df_hist["fraudulent"], edges, fill=True, alpha=0.7, label="Fraudulent", color="crimson")
     ax.set_title("Transaction Amount Distribution: Legitimate vs Fraudulent", fontsize=14)
     ax.set_xlabel("Amount ($)")
     ax.set_ylabel("Count")
     ax.legend()
     plt.tight_layout()
-    plt.savefig("outputs/amount_distribution.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "amount_distribution.png"), dpi=150)
     plt.close()
     print("[+] Saved amount_distribution.png")
 
 
-def plot_fraud_by_demographics(df_age: pd.DataFrame, df_gender: pd.DataFrame) -> None:
+def plot_fraud_by_demographics(df_age: pd.DataFrame, df_gender: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Side-by-side: fraud rate by age group and gender."""
+    plt = _pyplot()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
 
     # Age group
@@ -371,13 +2196,14 @@ def plot_fraud_by_demographics(df_age: pd.DataFrame, df_gender: pd.DataFrame) ->
     ax2.set_ylabel("Fraud Rate (%)")
 
     plt.tight_layout()
-    plt.savefig("outputs/fraud_demographics.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_demographics.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_demographics.png")
 
 
-def plot_fraud_by_state(df_state: pd.DataFrame) -> None:
+def plot_fraud_by_state(df_state: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Top states by fraud count."""
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 6))
     df_state.sort_values("fraud_txns").plot(
         x="state", y="fraud_txns", kind="barh", ax=ax, color="darkred", legend=False
@@ -386,13 +2212,14 @@ def plot_fraud_by_state(df_state: pd.DataFrame) -> None:
     ax.set_xlabel("Fraud Transactions")
     ax.set_ylabel("")
     plt.tight_layout()
-    plt.savefig("outputs/fraud_by_state.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_by_state.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_by_state.png")
 
 
-def plot_fraud_trend(df_trend: pd.DataFrame) -> None:
+def plot_fraud_trend(df_trend: pd.DataFrame, out_dir: str = "outputs") -> None:
     """Monthly fraud rate trend line."""
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 5))
     ax.plot(range(len(df_trend)), df_trend["fraud_rate_pct"], marker="o", color="crimson", linewidth=2)
     ax.set_xticks(range(len(df_trend)))
@@ -401,105 +2228,514 @@ def plot_fraud_trend(df_trend: pd.DataFrame) -> None:
     ax.set_ylabel("Fraud Rate (%)")
     ax.set_xlabel("Month")
     plt.tight_layout()
-    plt.savefig("outputs/fraud_monthly_trend.png", dpi=150)
+    plt.savefig(os.path.join(out_dir, "fraud_monthly_trend.png"), dpi=150)
     plt.close()
     print("[+] Saved fraud_monthly_trend.png")
 
 
+def _init_render_worker() -> None:
+    """Chart worker setup: render off-screen with the Agg backend."""
+    import matplotlib
+    matplotlib.use("Agg")
+    warnings.filterwarnings("ignore")
+
+
+# ──────────────────────────────────────────────────────────
+# 6. PIPELINE
+# ──────────────────────────────────────────────────────────
+
+# Analyses the CLI can run: output name -> (section title, function of conn).
+# Results with an empty title are exported but not printed.
+ANALYSES = {
+    "overview": ("", fraud_overview),
+    "fraud_by_category": ("Fraud by Category", fraud_by_category),
+    "fraud_by_hour": ("Fraud by Hour", fraud_by_hour),
+    "fraud_by_day_of_week": ("Fraud by Day of Week", fraud_by_day_of_week),
+    "fraud_by_amount": ("Fraud by Amount Bucket", fraud_by_amount_bucket),
+    "fraud_by_state": ("Fraud by State (Top 15)", fraud_by_state),
+    "fraud_by_gender": ("Fraud by Gender", fraud_by_gender),
+    "fraud_by_age_group": ("Fraud by Age Group", fraud_by_age_group),
+    "fraud_by_city_size": ("Fraud by City Size", fraud_by_city_size),
+    "repeat_fraud_cards": ("Repeat Fraud Cards (Top 20)", repeat_fraud_cards),
+    "high_risk_merchants": ("High-Risk Merchants (Top 20)", high_risk_merchants),
+    "fraud_monthly_trend": ("Monthly Fraud Trend", fraud_trend_monthly),
+    "rapid_successive_txns": ("Rapid Successive Transactions (<= 10 min, Top 20)", rapid_successive_txns),
+    "geo_velocity_anomalies": ("Geo-Velocity Anomalies (> 100 mi within 1 hour, Top 20)", geo_velocity_anomalies),
+    "fraud_risk_scorecard": ("Fraud Risk Scorecard (rate > 5%, Top 25)", high_risk_scorecard),
+    "amount_histogram": ("", amount_histogram),
+}
+
+# Charts: PNG name -> (plot function, analyses passed to it in order)
+CHARTS = {
+    "fraud_rate_by_category": (plot_fraud_by_category, ["fraud_by_category"]),
+    "fraud_rate_by_hour": (plot_fraud_by_hour, ["fraud_by_hour"]),
+    "fraud_rate_by_day": (plot_fraud_by_day, ["fraud_by_day_of_week"]),
+    "fraud_rate_by_amount": (plot_fraud_by_amount, ["fraud_by_amount"]),
+    "amount_distribution": (plot_amount_distribution, ["amount_histogram"]),
+    "fraud_demographics": (plot_fraud_by_demographics, ["fraud_by_age_group", "fraud_by_gender"]),
+    "fraud_by_state": (plot_fraud_by_state, ["fraud_by_state"]),
+    "fraud_monthly_trend": (plot_fraud_trend, ["fraud_monthly_trend"]),
+}
+
+EXPORT_FORMATS = ("csv", "json", "parquet")
+
+
+def _export_frame(data: pd.DataFrame, path: str, fmt: str = "csv") -> None:
+    """Write one result DataFrame to path in the given EXPORT_FORMATS format."""
+    if fmt == "csv":
+        data.to_csv(path, index=False)
+    elif fmt == "json":
+        data.to_json(path, orient="records", indent=2)
+    else:
+        data.to_parquet(path, index=False)
+
+
+def export_results(results: dict, out_dir: str, fmt: str = "csv") -> int:
+    """Write each DataFrame in results to out_dir/<name>.<fmt>; returns the number written."""
+    written = 0
+    for name, data in results.items():
+        if data is not None:
+            _export_frame(data, os.path.join(out_dir, f"{name}.{fmt}"), fmt)
+            written += 1
+    return written
+
+
+class Node:
+    """
+    One step of the analysis DAG.
+
+    A "query" node runs func(conn, *args) on a read connection; "chart" and
+    "export" nodes run func(*input results, *args). `inputs` name the nodes
+    whose results are passed in, `outputs` the files the node writes.
+    """
+
+    def __init__(self, name: str, kind: str, func, inputs: tuple = (), args: tuple = (), outputs: tuple = ()):
+        self.name = name
+        self.kind = kind
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.args = tuple(args)
+        self.outputs = tuple(outputs)
+
+
+def _rate_from_counters(conn: sqlite3.Connection, query: str) -> pd.DataFrame:
+    """One RATE_QUERIES result, read from the stored counters (see fraud_aggregates)."""
+    return fraud_aggregates(conn, [query])[query]
+
+
+def build_dag(analyses: list, charts: list, out_dir: str, fmt: str = "csv") -> dict:
+    """
+    Nodes for the selected analyses (plus chart inputs), their exports and the charts.
+
+    The grouped rate queries are answered from the stored rate counters, so
+    main brings those up to date before running the graph.
+    """
+    needed = list(dict.fromkeys(analyses + [i for name in charts for i in CHARTS[name][1]]))
+    nodes = {}
+    for name in needed:
+        func = ANALYSES[name][1]
+        if func.__name__ in RATE_QUERIES:
+            nodes[name] = Node(name, "query", _rate_from_counters, args=(func.__name__,))
+        else:
+            nodes[name] = Node(name, "query", func)
+    for name in analyses:
+        if name != "overview":
+            path = os.path.join(out_dir, f"{name}.{fmt}")
+            nodes[f"export:{name}"] = Node(f"export:{name}", "export", _export_frame,
+                                           inputs=(name,), args=(path, fmt), outputs=(path,))
+    for name in charts:
+        func, inputs = CHARTS[name]
+        nodes[f"chart:{name}"] = Node(f"chart:{name}", "chart", func, inputs=inputs, args=(out_dir,),
+                                      outputs=(os.path.join(out_dir, f"{name}.png"),))
+    return nodes
+
+
+def _data_stamp(conn: sqlite3.Connection) -> str:
+    """Identifies the database contents: its load uid and how many rows it holds."""
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+    # A database without a uid gets a new stamp each run, so its outputs are never up to date
+    return f"{_database_uid(conn) or uuid.uuid4().hex}:{max_rowid}"
+
+
+def _nodes_to_run(nodes: dict, fresh: set) -> set:
+    """
+    Nodes that must execute: those with stale outputs, plus every node
+    whose result a must-run node consumes.
+    """
+    dependents = {name: [] for name in nodes}
+    for node in nodes.values():
+        for parent in node.inputs:
+            dependents[parent].append(node.name)
+    must_run = set()
+
+    def visit(name: str) -> bool:
+        if name not in must_run:
+            node = nodes[name]
+            if node.outputs:
+                stale = name not in fresh
+            else:
+                stale = not dependents[name]  # e.g. overview, which only prints
+            if stale or any(visit(child) for child in dependents[name]):
+                must_run.add(name)
+        return name in must_run
+
+    for name in nodes:
+        visit(name)
+    return must_run
+
+
+def critical_path(nodes: dict, durations: dict, root: str = "load") -> tuple:
+    """Longest chain of dependent node durations: ([node names], total seconds)."""
+    finish, previous = {root: durations.get(root, 0.0)}, {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            parents = nodes[name].inputs or (root,)
+            best = max(parents, key=finish_time)
+            previous[name] = best
+            finish[name] = finish[best] + durations.get(name, 0.0)
+        return finish[name]
+
+    end = max(nodes, key=finish_time) if nodes else root
+    path = [end]
+    while path[-1] in previous:
+        path.append(previous[path[-1]])
+    return path[::-1], finish_time(end) if nodes else finish[root]
+
+
+def run_dag(nodes: dict, conn: sqlite3.Connection, db_path: str, force: bool = False,
+            max_workers: Optional[int] = None, state_file: Optional[str] = None) -> dict:
+    """
+    Execute a build_dag graph, running independent nodes concurrently.
+
+    Queries run in a thread pool, each thread on its own read-only
+    connection (so SQLite scans proceed in parallel); for an in-memory
+    database they run one at a time on `conn` in the calling thread. Charts render in a process
+    pool and exports are written from threads. Nodes whose output files
+    were written for the current data (recorded in `state_file`) are
+    skipped unless `force`, as are the queries that only feed them.
+    Each executed node's timing record is added to RUN_REPORT.
+    Returns {"results", "durations", "errors", "skipped"}; durations are
+    the wall time measured inside the worker, so time spent waiting for a
+    free pool slot does not count towards the critical path.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    stamp = _data_stamp(conn)
+    state = {}
+    if state_file and os.path.exists(state_file):
+        with open(state_file) as fh:
+            state = json.load(fh)
+    fresh = set() if force else {
+        name for name, node in nodes.items()
+        if node.outputs and all(os.path.exists(p) and state.get(p) == stamp for p in node.outputs)
+    }
+    to_run = _nodes_to_run(nodes, fresh)
+
+    local = threading.local()
+    read_conns = []
+    lock = threading.Lock()
+
+    def run_query_node(node: Node):
+        if not hasattr(local, "conn"):
+            local.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+            with lock:
+                read_conns.append(local.conn)
+        return measured(node.func, local.conn, *node.args)
+
+    results, durations, errors, started = {}, {}, {}, {}
+    pending = {name for name in nodes if name in to_run}
+    done = set(nodes) - pending
+    with ThreadPoolExecutor(max_workers) as query_pool, ThreadPoolExecutor(max_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers, initializer=_init_render_worker) as chart_pool:
+        running = {}
+        while pending or running:
+            for name in sorted(pending):
+                node = nodes[name]
+                if not all(parent in done for parent in node.inputs):
+                    continue
+                pending.discard(name)
+                failed = [parent for parent in node.inputs if parent in errors]
+                if failed:
+                    errors[name] = RuntimeError(f"skipped: input {failed[0]} failed")
+                    done.add(name)
+                    continue
+                inputs = [results[parent] for parent in node.inputs]
+                started[name] = time.perf_counter()
+                if node.kind == "query" and db_path == ":memory:":
+                    # Another connection cannot see an in-memory database
+                    future = Future()
+                    try:
+                        future.set_result(measured(node.func, conn, *node.args))
+                    except Exception as exc:
+                        future.set_exception(exc)
+                elif node.kind == "query":
+                    future = query_pool.submit(run_query_node, node)
+                elif node.kind == "chart":
+                    future = chart_pool.submit(measured, node.func, *inputs, *node.args)
+                else:
+                    future = io_pool.submit(measured, node.func, *inputs, *node.args)
+                running[future] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    # No in-worker timing for a failed node; this includes any queueing
+                    durations[name] = time.perf_counter() - started[name]
+                    errors[name] = future.exception()
+                    print(f"[!] {name} failed: {errors[name]!r}")
+                else:
+                    results[name], record = future.result()
+                    durations[name] = record["wall_s"]
+                    # Queries count the rows they return, charts and exports the rows they consume
+                    frames = [results[name]] if nodes[name].kind == "query" else \
+                        [results[parent] for parent in nodes[name].inputs]
+                    if all(isinstance(frame, pd.DataFrame) for frame in frames):
+                        record["rows"] = sum(len(frame) for frame in frames)
+                    RUN_REPORT.add(name, record)
+                    for path in nodes[name].outputs:
+                        state[path] = stamp
+                done.add(name)
+
+    for read_conn in read_conns:
+        read_conn.close()
+    if state_file:
+        with open(state_file, "w") as fh:
+            json.dump(state, fh, indent=2, sort_keys=True)
+    skipped = sorted(set(nodes) - to_run)
+    return {"results": results, "durations": durations, "errors": errors, "skipped": skipped}
+
+
+# ──────────────────────────────────────────────────────────
+# 7. INSTRUMENTATION
+# ──────────────────────────────────────────────────────────
+
+def peak_rss_mb() -> float:
+    """High-water resident set size of this process in MB (0.0 where unavailable)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+@contextmanager
+def measure(rows: Optional[int] = None):
+    """
+    Time the enclosed block; yields a dict that is filled on exit with
+    wall_s, cpu_s (of the current thread) and peak_rss_delta_mb.
+
+    peak_rss_delta_mb is how far the block raised the process's RSS
+    high-water mark, so it is zero for blocks that fit in memory an
+    earlier stage already used. Set record["rows"] inside the block when
+    the row count is only known there.
+    """
+    record = {"rows": rows}
+    wall, cpu, rss = time.perf_counter(), time.thread_time(), peak_rss_mb()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_s"] = time.thread_time() - cpu
+        record["peak_rss_delta_mb"] = peak_rss_mb() - rss
+
+
+def measured(func, *args) -> tuple:
+    """(func(*args), measure record); picklable, so it also wraps work sent to worker processes."""
+    with measure() as record:
+        result = func(*args)
+    return result, record
+
+
+class RunReport:
+    """
+    Per-stage timing for one run, accumulated across threads.
+
+    Records for the same stage name (e.g. one per CSV chunk) are summed,
+    except peak_rss_delta_mb, which keeps the largest.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None):
+        """Measure the enclosed block as (part of) stage `name`."""
+        with measure(rows) as record:
+            yield record
+        self.add(name, record)
+
+    def add(self, name: str, record: dict) -> None:
+        with self._lock:
+            total = self.stages.setdefault(
+                name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_delta_mb": 0.0, "rows": None})
+            total["calls"] += 1
+            total["wall_s"] += record["wall_s"]
+            total["cpu_s"] += record["cpu_s"]
+            total["peak_rss_delta_mb"] = max(total["peak_rss_delta_mb"], record["peak_rss_delta_mb"])
+            if record.get("rows") is not None:
+                total["rows"] = (total["rows"] or 0) + record["rows"]
+
+    def summary(self) -> pd.DataFrame:
+        """One row per stage, slowest first, with rows/sec where rows were counted."""
+        with self._lock:
+            df = pd.DataFrame([{"stage": name, **total} for name, total in self.stages.items()],
+                              columns=["stage", "calls", "wall_s", "cpu_s", "peak_rss_delta_mb", "rows"])
+        df["rows_per_s"] = (df["rows"] / df["wall_s"]).where(df["wall_s"] > 0).round(0)
+        return df.sort_values("wall_s", ascending=False, kind="stable").reset_index(drop=True)
+
+    def write(self, path: str, **extra) -> None:
+        """Write the stages and any `extra` run fields to path as JSON."""
+        with self._lock:
+            report = {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+                **extra,
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "stages": {name: {key: round(value, 4) if isinstance(value, float) else value
+                                  for key, value in total.items()}
+                           for name, total in self.stages.items()},
+            }
+        with open(path, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+RUN_REPORT = RunReport()
+
+
+def stage(name: str, rows: Optional[int] = None):
+    """Measure a block as stage `name` of RUN_REPORT."""
+    return RUN_REPORT.stage(name, rows)
+
+
+def staged_chunks(chunks, name: str):
+    """Yield from chunks, timing each fetch (e.g. a CSV chunk parse) as stage `name`."""
+    chunks = iter(chunks)
+    while True:
+        with stage(name) as record:
+            chunk = next(chunks, None)
+            record["rows"] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+
 # ──────────────────────────────────────────────────────────
-# 4. MAIN
+# 8. MAIN
 # ──────────────────────────────────────────────────────────
 
-def main():
-    os.makedirs("outputs", exist_ok=True)
-    os.makedirs("data", exist_ok=True)
-
-    conn = load_data()
-
-    # Overview
-    fraud_overview(conn)
-
-    # Category analysis
-    print("\n--- Fraud by Category ---")
-    df_cat = fraud_by_category(conn)
-    print(df_cat.to_string(index=False))
-
-    # Temporal analysis
-    print("\n--- Fraud by Hour ---")
-    df_hour = fraud_by_hour(conn)
-    print(df_hour.to_string(index=False))
-
-    print("\n--- Fraud by Day of Week ---")
-    df_dow = fraud_by_day_of_week(conn)
-    print(df_dow.to_string(index=False))
-
-    # Amount analysis
-    print("\n--- Fraud by Amount Bucket ---")
-    df_amt = fraud_by_amount_bucket(conn)
-    print(df_amt.to_string(index=False))
-
-    # Geographic analysis
-    print("\n--- Fraud by State (Top 15) ---")
-    df_state = fraud_by_state(conn)
-    print(df_state.to_string(index=False))
-
-    # Demographic analysis
-    print("\n--- Fraud by Gender ---")
-    df_gender = fraud_by_gender(conn)
-    print(df_gender.to_string(index=False))
-
-    print("\n--- Fraud by Age Group ---")
-    df_age = fraud_by_age_group(conn)
-    print(df_age.to_string(index=False))
-
-    print("\n--- Fraud by City Size ---")
-    df_city = fraud_by_city_size(conn)
-    print(df_city.to_string(index=False))
-
-    # Pattern detection
-    print("\n--- Repeat Fraud Cards (Top 20) ---")
-    df_repeat = repeat_fraud_cards(conn)
-    print(df_repeat.to_string(index=False))
-
-    print("\n--- High-Risk Merchants (Top 20) ---")
-    df_merchants = high_risk_merchants(conn)
-    print(df_merchants.to_string(index=False))
-
-    # Trend
-    print("\n--- Monthly Fraud Trend ---")
-    df_trend = fraud_trend_monthly(conn)
-    print(df_trend.to_string(index=False))
-
-    # Visualizations
-    print("\n--- Generating Visualizations ---")
-    plot_fraud_by_category(df_cat)
-    plot_fraud_by_hour(df_hour)
-    plot_fraud_by_day(df_dow)
-    plot_fraud_by_amount(df_amt)
-    plot_amount_distribution(conn)
-    plot_fraud_by_demographics(df_age, df_gender)
-    plot_fraud_by_state(df_state)
-    plot_fraud_trend(df_trend)
-
-    # Export results
-    for name, data in [
-        ("fraud_by_category", df_cat),
-        ("fraud_by_hour", df_hour),
-        ("fraud_by_day_of_week", df_dow),
-        ("fraud_by_amount", df_amt),
-        ("fraud_by_state", df_state),
-        ("fraud_by_gender", df_gender),
-        ("fraud_by_age_group", df_age),
-        ("fraud_by_city_size", df_city),
-        ("repeat_fraud_cards", df_repeat),
-        ("high_risk_merchants", df_merchants),
-        ("fraud_monthly_trend", df_trend),
-    ]:
-        data.to_csv(f"outputs/{name}.csv", index=False)
-
-    print(f"\n[+] Exported {11} CSV files to outputs/")
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load the transactions CSV into SQLite, run the fraud analyses, "
+                    "and write charts and result files.",
+    )
+    parser.add_argument("--input", nargs="+", default=["data/fraudTrain.csv"], metavar="CSV",
+                        help="transactions CSVs or glob patterns to load (e.g. 'data/monthly/*.csv')")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH,
+                        help="SQLite database (reused while the CSV is unchanged; ':memory:' for none)")
+    parser.add_argument("--no-cache", action="store_true", help="rebuild the database even if it is current")
+    parser.add_argument("--append", nargs="+", metavar="CSV", default=[],
+                        help="add the new rows of these CSVs to the database (duplicate trans_num are skipped)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="CSV rows per ingest chunk")
+    parser.add_argument("--workers", type=int, help=f"processes that parse the CSVs (default: {DEFAULT_WORKERS}; each holds one chunk)")
+    parser.add_argument("--parquet", metavar="DIR",
+                        help="also keep the enriched rows as a month-partitioned Parquet dataset (needs pyarrow)")
+    parser.add_argument("--analyses", nargs="+", choices=list(ANALYSES), metavar="NAME",
+                        help="analyses to run (default: all; see --list)")
+    parser.add_argument("--charts", nargs="+", choices=list(CHARTS), metavar="NAME",
+                        help="charts to render (default: those whose analyses are selected)")
+    parser.add_argument("--no-charts", action="store_true", help="skip chart rendering")
+    parser.add_argument("--output-dir", default="outputs", help="directory for charts and result files")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="result file format")
+    parser.add_argument("--force", action="store_true", help="rerun steps whose outputs are up to date")
+    parser.add_argument("--query-cache", metavar="DIR",
+                        help="keep query results on disk here for later runs (needs pyarrow)")
+    parser.add_argument("--list", action="store_true", help="list analyses and charts, then exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> None:
+    args = parse_args(argv)
+    if args.list:
+        print("Analyses:\n  " + "\n  ".join(ANALYSES))
+        print("Charts:\n  " + "\n  ".join(
+            f"{name} (needs {', '.join(inputs)})" for name, (_, inputs) in CHARTS.items()))
+        return
+
+    analyses = args.analyses or list(ANALYSES)
+    if args.no_charts:
+        charts = []
+    elif args.charts:
+        charts = args.charts
+    else:
+        charts = [name for name, (_, inputs) in CHARTS.items() if set(inputs) <= set(analyses)]
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.db != ":memory:":
+        os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+
+    if args.query_cache:
+        _pyarrow("--query-cache")  # fail before loading anything
+        QUERY_CACHE.disk_dir = args.query_cache
+    RUN_REPORT.reset()
+    start = time.perf_counter()
+    conn = load_data(args.input, db_path=args.db, chunksize=args.chunksize, use_cache=not args.no_cache,
+                     parquet_dir=args.parquet, workers=args.workers)
+    for path in args.append:
+        append_data(conn, path, chunksize=args.chunksize)
+    nodes = build_dag(analyses, charts, args.output_dir, args.format)
+    # Bring the stored aggregates up to date before queries fan out to read-only connections
+    if any(node.func is _rate_from_counters for node in nodes.values()):
+        with stage("refresh:rate_counters"):
+            refresh_rate_counters(conn)
+    if "fraud_risk_scorecard" in nodes:
+        with stage("refresh:scorecard"):
+            refresh_scorecard(conn)
+    load_seconds = time.perf_counter() - start
+
+    print(f"\n--- Running {len(nodes)} pipeline steps ---")
+    run = run_dag(nodes, conn, args.db, force=args.force,
+                  state_file=os.path.join(args.output_dir, ".pipeline_state.json"))
+
+    for name in analyses:
+        data = run["results"].get(name)
+        if data is not None and ANALYSES[name][0]:
+            print(f"\n--- {ANALYSES[name][0]} ---")
+            print(data.to_string(index=False))
+
+    if run["skipped"]:
+        print(f"\n[=] {len(run['skipped'])} steps up to date, skipped")
+    written = sum(node.kind == "export" and name in run["durations"] and name not in run["errors"]
+                  for name, node in nodes.items())
+    print(f"[+] Exported {written} {args.format.upper()} files to {args.output_dir}/")
+    if run["errors"]:
+        print(f"[!] {len(run['errors'])} steps failed: {', '.join(sorted(run['errors']))}")
+    cache = QUERY_CACHE.stats()
+    print(f"[+] Query cache: {cache['hits'] + cache['disk_hits']} hits "
+          f"({cache['disk_hits']} from disk), {cache['misses']} misses")
+
+    durations = dict(run["durations"], load=load_seconds)
+    path, total = critical_path(nodes, durations)
+    print("[+] Critical path: " + " -> ".join(f"{name} ({durations.get(name, 0.0):.2f}s)" for name in path)
+          + f" = {total:.2f}s")
+
+    report_path = os.path.join(args.output_dir, "run_report.json")
+    RUN_REPORT.write(report_path, argv=sys.argv[1:] if argv is None else list(argv),
+                     total_wall_s=round(time.perf_counter() - start, 3), query_cache=cache,
+                     failed=sorted(run["errors"]), skipped=run["skipped"])
+    summary = RUN_REPORT.summary()
+    print(f"\n--- Slowest Stages (all {len(summary)} in {report_path}) ---")
+    print(summary.head(10).to_string(index=False))
 
     conn.close()
+    if run["errors"]:
+        sys.exit(1)
     print("[+] Analysis complete!")
 
 
@@ -57,6 +57,21 @@ CREATE TABLE IF NOT EXISTS transactions (
 -- For geographic queries:
 -- CREATE INDEX idx_lat_long ON transactions(lat, long);
 -- CREATE INDEX idx_merch_lat_long ON transactions(merch_lat, merch_long);
+--
+-- Covering indexes for the per-card self-joins (5b, 5c) and a partial
+-- index holding only fraud rows for 5a (fraud_analysis.py builds these
+-- two automatically in SQLite, see INDEXES there):
+-- CREATE INDEX idx_card_time ON transactions(cc_num, trans_date_trans_time, is_fraud, amt);
+-- CREATE INDEX idx_fraud_card ON transactions(cc_num, trans_date_trans_time, amt) WHERE is_fraud = 1;
+--
+-- A covering index for the merchant fraud rates (5d). fraud_analysis.py
+-- stores merchant and category as integer keys into dim_merchant and
+-- dim_category, so its INDEXES build the same index as
+-- idx_merchant ON transactions(merchant_id, category_id, is_fraud, amt),
+-- plus idx_category ON transactions(category_id, is_fraud, amt) and
+-- (column, is_fraud) indexes on its derived hour, weekday, month, amount
+-- bucket and age group columns. On the table above it would be:
+-- CREATE INDEX idx_merchant_fraud ON transactions(merchant, category, is_fraud, amt);
 -- ============================================================
 
 
@@ -310,6 +325,8 @@ ORDER BY fraud_rate_pct DESC;
 -- ============================================================
 -- 7. SUMMARY VIEW: FRAUD RISK SCORE CARD
 -- ============================================================
+-- fraud_analysis.py keeps a materialized copy of this view's counters
+-- (fraud_risk_scorecard_cube) that is refreshed incrementally on append.
 
 CREATE OR REPLACE VIEW fraud_risk_scorecard AS
 SELECT
@@ -0,0 +1,100 @@
+"""
+The numpy and counter engines must return exactly what the SQL queries do,
+on a fresh load, after append_data adds rows (some of them duplicates)
+and on rates that fall exactly on a rounding tie.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+import fraud_analysis as fa  # noqa: E402
+import synthetic_data  # noqa: E402
+
+ROWS = 30_000
+LOADED = 20_000
+OVERLAP = 5_000
+
+
+@pytest.fixture(scope="module")
+def csvs(tmp_path_factory):
+    """A base CSV and a delta CSV whose first OVERLAP rows repeat the base's last ones."""
+    data_dir = tmp_path_factory.mktemp("data")
+    rows = synthetic_data.generate(ROWS, seed=7, chunk_rows=10_000)
+    base, delta = data_dir / "base.csv", data_dir / "delta.csv"
+    rows.iloc[:LOADED].to_csv(base)
+    rows.iloc[LOADED - OVERLAP:].to_csv(delta)
+    return base, delta
+
+
+@pytest.fixture(scope="module")
+def ties(tmp_path_factory):
+    """
+    Rows whose category rates (1 fraud in 800, 2 in 1,600) and average
+    fraud amount ((1.12 + 1.13) / 2) land exactly on a rounding tie.
+    """
+    rows = synthetic_data.generate(2_400, seed=11, chunk_rows=2_400)
+    rows["category"] = ["grocery_pos"] * 800 + ["misc_net"] * 1_600
+    rows["is_fraud"] = 0
+    rows.loc[[0, 800, 801], "is_fraud"] = 1
+    rows.loc[[800, 801], "amt"] = [1.12, 1.13]
+    path = tmp_path_factory.mktemp("ties") / "ties.csv"
+    rows.to_csv(path)
+    conn = _load(path, tmp_path_factory)
+    yield conn
+    conn.close()
+
+
+def _load(csv, tmp_path_factory):
+    return fa.load_data(str(csv), db_path=str(tmp_path_factory.mktemp("db") / "fraud.sqlite"),
+                        chunksize=7_000, workers=1)
+
+
+@pytest.fixture(scope="module")
+def loaded(csvs, tmp_path_factory):
+    conn = _load(csvs[0], tmp_path_factory)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def appended(csvs, tmp_path_factory):
+    conn = _load(csvs[0], tmp_path_factory)
+    # Build the column store and counters first so the append is folded in incrementally
+    for name in fa.RATE_QUERIES:
+        _assert_backends_match(conn, name)
+    assert fa.append_data(conn, str(csvs[1]), chunksize=4_000) == ROWS - LOADED
+    yield conn
+    conn.close()
+
+
+def _assert_backends_match(conn, name):
+    query_func = getattr(fa, name)
+    expected = query_func(conn, backend="sqlite")
+    pd.testing.assert_frame_equal(query_func(conn, backend="numpy"), expected, obj=f"numpy {name}")
+    pd.testing.assert_frame_equal(fa.fraud_aggregates(conn, [name])[name], expected, obj=f"counters {name}")
+
+
+@pytest.mark.parametrize("name", list(fa.RATE_QUERIES))
+def test_backends_match_after_load(loaded, name):
+    _assert_backends_match(loaded, name)
+
+
+@pytest.mark.parametrize("name", list(fa.RATE_QUERIES))
+def test_backends_match_after_append(appended, name):
+    assert appended.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == ROWS
+    _assert_backends_match(appended, name)
+
+
+def test_backends_round_ties_like_sqlite(ties):
+    expected = fa.fraud_by_category(ties, backend="sqlite")
+    assert expected["fraud_rate_pct"].tolist() == [0.13, 0.13]
+    assert expected["avg_fraud_amt"].iloc[1] == 1.13
+    for name in fa.RATE_QUERIES:
+        _assert_backends_match(ties, name)
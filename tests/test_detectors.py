@@ -0,0 +1,87 @@
+"""
+The sort-and-sweep detectors must find exactly the pairs the per-card
+self-joins in fraud_detection_queries.sql (5b, 5c) find, and the binning
+done in SQLite by amount_histogram must match np.histogram.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+import fraud_analysis as fa  # noqa: E402
+import synthetic_data  # noqa: E402
+
+ROWS = 20_000
+ALL = 10**9  # n large enough to return every pair
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    path = tmp_path_factory.mktemp("data") / "synthetic.csv"
+    synthetic_data.generate(ROWS, seed=3, chunk_rows=10_000).to_csv(path)
+    conn = fa.load_data(str(path), chunksize=None, workers=1)
+    yield conn
+    conn.close()
+
+
+def _self_join_pairs(conn, window_seconds, where, columns=""):
+    """Same-card pairs (t1 strictly before t2, within the window) as query 5b/5c joins them."""
+    return conn.execute(f"""
+        SELECT t1.trans_num, t2.trans_num,
+               (t2.trans_date_trans_time - t1.trans_date_trans_time) / 60.0{columns}
+        FROM transactions t1
+        JOIN transactions t2
+            ON  t1.cc_num = t2.cc_num
+            AND t2.trans_date_trans_time > t1.trans_date_trans_time
+            AND t2.trans_date_trans_time <= t1.trans_date_trans_time + {window_seconds}
+        WHERE {where}
+    """).fetchall()
+
+
+def test_rapid_successive_txns_matches_self_join(conn):
+    expected = _self_join_pairs(conn, 600, "t1.is_fraud = 1 OR t2.is_fraud = 1")
+    found = fa.rapid_successive_txns(conn, n=ALL)
+    assert expected
+    assert sorted(zip(found["txn1_id"], found["txn2_id"], found["minutes_apart"])) == sorted(expected)
+    assert found["minutes_apart"].is_monotonic_increasing
+
+
+def test_geo_velocity_anomalies_matches_self_join(conn):
+    try:
+        conn.execute("SELECT acos(1), radians(1)")
+    except sqlite3.OperationalError:
+        pytest.skip("SQLite built without math functions")
+    # Query 5c's distance, on the merchant coordinates the detector uses
+    distance = """, 3959 * acos(min(1,
+        cos(radians(t1.merch_lat)) * cos(radians(t2.merch_lat)) * cos(radians(t2.merch_long) - radians(t1.merch_long))
+        + sin(radians(t1.merch_lat)) * sin(radians(t2.merch_lat))))"""
+    expected = sorted(row for row in _self_join_pairs(conn, 3600, "1", distance) if row[3] > 100)
+    found = fa.geo_velocity_anomalies(conn, n=ALL)
+    assert expected
+    assert sorted(zip(found["txn1"], found["txn2"], found["minutes_apart"])) == [row[:3] for row in expected]
+    found = found.sort_values(["txn1", "txn2"])
+    assert found["distance_miles"].tolist() == pytest.approx([row[3] for row in expected], abs=0.051)
+    # Each side is reported at its own merchant, not the cardholder's home
+    location = {row[0]: row[1:] for row in conn.execute(
+        f"SELECT trans_num, merchant, merch_lat, merch_long FROM {fa.NAMED_VIEW}")}
+    for side in "12":
+        assert [location[txn] for txn in found[f"txn{side}"]] == list(zip(
+            found[f"merchant{side}"], found[f"merch_lat{side}"], found[f"merch_long{side}"]))
+
+
+@pytest.mark.parametrize("bins, amount_range", [(50, (0, 1500)), (7, (12.5, 400))])
+def test_amount_histogram_matches_np_histogram(conn, bins, amount_range):
+    amt, is_fraud = np.array(conn.execute("SELECT amt, is_fraud FROM transactions").fetchall()).T
+    hist = fa.amount_histogram(conn, bins=bins, amount_range=amount_range)
+    for label, flag in [("legitimate", 0), ("fraudulent", 1)]:
+        counts, edges = np.histogram(amt[is_fraud == flag], bins=bins, range=amount_range)
+        assert hist[label].tolist() == counts.tolist()
+        assert hist["bin_left"].tolist() == edges[:-1].tolist()
+        assert hist["bin_right"].tolist() == edges[1:].tolist()